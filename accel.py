@@ -0,0 +1,221 @@
+"""
+Optional compiled kernels for the discrete memristor and memristive FHN map
+Uses Numba when it is installed, with a pure-NumPy fallback when it is not
+"""
+
+import numpy as np
+
+from utils import (MAX_VAL, discrete_memristor_step, iterate_memristive_fhn,
+                   n_recorded_steps)
+
+try:
+    import numba
+    HAVE_NUMBA = True
+except ImportError:
+    numba = None
+    HAVE_NUMBA = False
+
+
+BACKENDS = ('numpy', 'numba')
+
+# Active backend (module-wide default, can be overridden per call)
+_backend = 'numba' if HAVE_NUMBA else 'numpy'
+
+
+def set_backend(name):
+    """
+    Select the backend used by the accelerated entry points
+
+    Parameters:
+    -----------
+    name : str
+        'numba' (compiled kernels) or 'numpy' (reference implementation)
+    """
+    global _backend
+    _backend = _resolve_backend(name)
+
+
+def get_backend():
+    """Return the name of the active backend"""
+    return _backend
+
+
+def _resolve_backend(name):
+    if name is None:
+        return _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}', expected one of {BACKENDS}")
+    if name == 'numba' and not HAVE_NUMBA:
+        raise ImportError("The 'numba' backend requires numba to be installed")
+    return name
+
+
+def _jit(func):
+    """Compile func with numba.njit when available, otherwise return it unchanged"""
+    if HAVE_NUMBA:
+        return numba.njit(cache=True)(func)
+    return func
+
+
+# ============================================================================
+# KERNELS
+# ============================================================================
+# Written as plain scalar loops so that Numba can compile them to native
+# code. The arithmetic mirrors utils.memristive_fhn_map operation for
+# operation, which keeps both paths bit-for-bit identical.
+
+@_jit
+def _memristive_fhn_kernel(x, y, z, gamma, theta, delta, I_ext, k1, k2):
+    if abs(x) > MAX_VAL or abs(y) > MAX_VAL or abs(z) > MAX_VAL:
+        return np.nan, np.nan, np.nan
+
+    x_next = x - (x**3.0)/3 - y + I_ext + k1 * z * x
+    y_next = gamma * y + theta * x + delta
+    z_next = z + np.sin(z) - k2 * x
+    return x_next, y_next, z_next
+
+
+@_jit
+def _iterate_kernel(x, y, z, gamma, theta, delta, I_ext, k1, k2,
+                    n_steps, transient, record_every, out):
+    j = 0
+    for i in range(n_steps):
+        x, y, z = _memristive_fhn_kernel(x, y, z, gamma, theta, delta,
+                                         I_ext, k1, k2)
+        if i >= transient and (i - transient) % record_every == 0:
+            out[j, 0] = x
+            out[j, 1] = y
+            out[j, 2] = z
+            j += 1
+    return out
+
+
+@_jit
+def _memristor_kernel(x0, v, a, b, h, x_out):
+    x_out[0] = x0
+    for n in range(len(v) - 1):
+        x_out[n+1] = x_out[n] + h * (a * np.sin(x_out[n]) + b * v[n])
+    return x_out
+
+
+# ============================================================================
+# PUBLIC ENTRY POINTS
+# ============================================================================
+
+def iterate_memristive_fhn_fast(initial_state, params, n_steps, transient=0,
+                                record_every=1, out=None, backend=None):
+    """
+    Iterate the memristive FHN map with the selected backend
+
+    Drop-in replacement for utils.iterate_memristive_fhn.
+
+    Parameters:
+    -----------
+    initial_state : array, shape (3,)
+        Initial [x, y, z]
+    params : dict
+        Must contain: 'gamma', 'theta', 'delta', 'I_ext', 'k1', 'k2'
+    n_steps : int
+        Number of iterations
+    transient : int
+        Number of initial steps to discard
+    record_every : int
+        Keep one state every record_every steps after the transient
+    out : array, shape (n_recorded, 3), optional
+        Preallocated buffer to write the trajectory into
+    backend : str, optional
+        'numba' or 'numpy'; defaults to the active backend
+
+    Returns:
+    --------
+    trajectory : array, shape (n_recorded, 3)
+        System trajectory after transient (out, if it was given)
+    """
+    if _resolve_backend(backend) == 'numpy':
+        return iterate_memristive_fhn(initial_state, params, n_steps, transient,
+                                      record_every=record_every, out=out)
+
+    if record_every < 1:
+        raise ValueError(f"record_every must be >= 1, got {record_every}")
+
+    n_recorded = n_recorded_steps(n_steps, transient, record_every)
+    if out is None:
+        out = np.empty((n_recorded, 3))
+    elif out.shape != (n_recorded, 3):
+        raise ValueError(f"out has shape {out.shape}, expected {(n_recorded, 3)}")
+
+    x0, y0, z0 = (float(s) for s in initial_state)
+    return _iterate_kernel(x0, y0, z0,
+                           float(params['gamma']), float(params['theta']),
+                           float(params['delta']), float(params['I_ext']),
+                           float(params['k1']), float(params['k2']),
+                           int(n_steps), int(transient), int(record_every), out)
+
+
+def memristor_response(x0, v, a, b, h, backend=None):
+    """
+    Drive the discrete memristor with a voltage sequence
+
+    x_{n+1} = x_n + h[a*sin(x_n) + b*v_n],  i_n = x_n * v_n
+
+    Parameters:
+    -----------
+    x0 : float
+        Initial memristor state
+    v : array, shape (n,)
+        Input voltage at each step
+    a, b, h : float
+        Memristor parameters
+    backend : str, optional
+        'numba' or 'numpy'; defaults to the active backend
+
+    Returns:
+    --------
+    x : array, shape (n,)
+        Memristor state
+    i : array, shape (n,)
+        Memristor current
+    """
+    v = np.ascontiguousarray(v, dtype=float)
+    x = np.empty_like(v)
+    if len(v) == 0:
+        return x, x.copy()
+
+    if _resolve_backend(backend) == 'numpy':
+        x[0] = x0
+        for n in range(len(v) - 1):
+            x[n+1] = discrete_memristor_step(x[n], v[n], a, b, h)
+    else:
+        _memristor_kernel(float(x0), v, float(a), float(b), float(h), x)
+
+    return x, x * v
+
+
+def simulate_memristor_hysteresis(A, f, x0, a, b, h, n_cycles=5, backend=None):
+    """
+    Memristor response to a sinusoidal input (pinched hysteresis loop)
+
+    Parameters:
+    -----------
+    A : float
+        Input amplitude
+    f : float
+        Input frequency
+    x0 : float
+        Initial memristor state
+    a, b, h : float
+        Memristor parameters (h is also the sampling step)
+    n_cycles : int
+        Number of input periods to simulate
+    backend : str, optional
+        'numba' or 'numpy'; defaults to the active backend
+
+    Returns:
+    --------
+    t, v, x, i : arrays
+        Time, input voltage, memristor state and current
+    """
+    t = np.arange(0, n_cycles / f, h)
+    v = A * np.sin(2 * np.pi * f * t)
+    x, i = memristor_response(x0, v, a, b, h, backend=backend)
+    return t, v, x, i
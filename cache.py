@@ -0,0 +1,278 @@
+"""
+Content-addressed on-disk cache for simulation results
+Results are keyed on the model code, parameters, initial state and
+step/time settings, and stored as compressed .npz files
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+
+import numpy as np
+
+import utils
+from config import CACHE_PARAMS
+from utils import integrate_ode, iterate_memristive_fhn
+
+
+def _file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+# Entries written by a different version of utils.py are treated as stale
+UTILS_HASH = _file_hash(utils.__file__)
+
+
+# ============================================================================
+# KEYS
+# ============================================================================
+
+def _update_hash(h, obj):
+    """Feed a canonical byte representation of obj into hasher h"""
+    if isinstance(obj, np.generic):
+        _update_hash(h, obj.item())
+    elif isinstance(obj, (int, float)) and not isinstance(obj, bool) and float(obj) == obj:
+        # Numbers by value: theta=1 and theta=1.0 give the same key
+        h.update(repr(('float', float(obj))).encode())
+    elif obj is None or isinstance(obj, (bool, int, float, complex, str)):
+        h.update(repr((type(obj).__name__, obj)).encode())
+    elif isinstance(obj, np.ndarray):
+        arr = np.ascontiguousarray(obj)
+        h.update(f"ndarray{arr.dtype.str}{arr.shape}".encode())
+        h.update(arr.tobytes())
+    elif isinstance(obj, dict):
+        h.update(b"dict")
+        for key in sorted(obj, key=repr):
+            _update_hash(h, key)
+            _update_hash(h, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        h.update(type(obj).__name__.encode())
+        for item in obj:
+            _update_hash(h, item)
+        h.update(b"end")
+    elif callable(obj):
+        h.update(_callable_fingerprint(obj).encode())
+    else:
+        raise TypeError(f"Cannot build a cache key from {type(obj).__name__}")
+
+
+def _callable_fingerprint(func):
+    """Name plus source code, so editing a model changes its key"""
+    name = f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', repr(func))}"
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        source = ''
+    return name + '\n' + source
+
+
+def cache_key(func, *args, **kwargs):
+    """
+    Content hash identifying a call func(*args, **kwargs)
+
+    Parameters:
+    -----------
+    func : callable
+        Simulation entry point
+    *args, **kwargs
+        Its arguments (arrays, dicts, scalars, lists and callables)
+
+    Returns:
+    --------
+    key : str
+        Hex digest
+    """
+    h = hashlib.sha256()
+    h.update(UTILS_HASH.encode())
+    _update_hash(h, func)
+    _update_hash(h, list(args))
+    _update_hash(h, kwargs)
+    return h.hexdigest()
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+class SimulationCache:
+    """
+    Directory of compressed .npz results with size-bounded LRU eviction
+
+    Parameters:
+    -----------
+    cache_dir : str, optional
+        Directory holding the entries (default from config.CACHE_PARAMS)
+    max_bytes : int, optional
+        Total size limit; least recently used entries are evicted first
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = cache_dir or CACHE_PARAMS['cache_dir']
+        self.max_bytes = max_bytes if max_bytes is not None else CACHE_PARAMS['max_bytes']
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + '.npz')
+
+    def _entries(self):
+        if not os.path.isdir(self.cache_dir):
+            return []
+        return [os.path.join(self.cache_dir, name)
+                for name in os.listdir(self.cache_dir) if name.endswith('.npz')]
+
+    def load(self, key):
+        """Return the cached array for key, or None on a miss"""
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                result = data['result']
+        except (OSError, KeyError, ValueError):
+            return None
+        # Mark as recently used
+        os.utime(path)
+        return result
+
+    def save(self, key, result, meta=None):
+        """Store an array under key and evict old entries if over the limit"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        meta = dict(meta or {}, utils_hash=UTILS_HASH)
+
+        # Write to a temporary file first so readers never see partial entries
+        fd, tmp_path = tempfile.mkstemp(suffix='.npz', dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez_compressed(f, result=np.asarray(result),
+                                    meta=np.array(json.dumps(meta)))
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self.evict()
+
+    def call(self, func, *args, **kwargs):
+        """
+        Return func(*args, **kwargs), computing it only on a cache miss
+
+        func must return a NumPy array.
+        """
+        key = cache_key(func, *args, **kwargs)
+        result = self.load(key)
+        if result is None:
+            result = np.asarray(func(*args, **kwargs))
+            self.save(key, result, meta={'func': _callable_fingerprint(func).split('\n')[0]})
+        return result
+
+    def size(self):
+        """Total size of all entries in bytes"""
+        return sum(os.path.getsize(path) for path in self._entries())
+
+    def evict(self, max_bytes=None):
+        """Delete least recently used entries until the cache fits max_bytes"""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = [(os.path.getmtime(p), os.path.getsize(p), p) for p in self._entries()]
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, path in sorted(entries):
+            if total <= limit:
+                break
+            os.remove(path)
+            total -= size
+
+    def clear(self):
+        """Delete every entry"""
+        for path in self._entries():
+            os.remove(path)
+
+    def prune_stale(self):
+        """
+        Delete entries written by a different version of utils.py
+
+        Returns:
+        --------
+        n_removed : int
+        """
+        n_removed = 0
+        for path in self._entries():
+            try:
+                with np.load(path, allow_pickle=False) as data:
+                    meta = json.loads(str(data['meta']))
+                stale = meta.get('utils_hash') != UTILS_HASH
+            except (OSError, KeyError, ValueError):
+                stale = True
+            if stale:
+                os.remove(path)
+                n_removed += 1
+        return n_removed
+
+
+# Default cache used by the module-level helpers
+default_cache = SimulationCache()
+
+
+# ============================================================================
+# CACHED ENTRY POINTS
+# ============================================================================
+
+def cached_iterate_memristive_fhn(initial_state, params, n_steps, transient=0,
+                                  record_every=1, cache=None):
+    """
+    Cached version of utils.iterate_memristive_fhn
+
+    Parameters:
+    -----------
+    initial_state, params, n_steps, transient, record_every
+        As for iterate_memristive_fhn
+    cache : SimulationCache, optional
+        Cache to use (default: default_cache)
+
+    Returns:
+    --------
+    trajectory : array, shape (n_recorded, 3)
+    """
+    cache = cache or default_cache
+    return cache.call(iterate_memristive_fhn, np.asarray(initial_state, dtype=float),
+                      dict(params), n_steps, transient, record_every=record_every)
+
+
+def cached_odeint(rhs, initial_state, t, params, cache=None):
+    """
+    Cached odeint(rhs, initial_state, t, args=(params,))
+
+    Use with coupled_fhn_static, coupled_fhn_plastic or any RHS taking
+    (state, t, params). The key includes the RHS source code. Runs
+    through utils.integrate_ode, so registered analytic Jacobians are used.
+
+    Parameters:
+    -----------
+    rhs : callable
+        Right-hand side rhs(state, t, params)
+    initial_state : array
+        Initial state
+    t : array
+        Output time grid
+    params : dict
+        Model parameters
+    cache : SimulationCache, optional
+        Cache to use (default: default_cache)
+
+    Returns:
+    --------
+    solution : array, shape (len(t), len(initial_state))
+    """
+    cache = cache or default_cache
+    return cache.call(integrate_ode, rhs, np.asarray(initial_state, dtype=float),
+                      np.asarray(t, dtype=float), args=(dict(params),))
+
+
+def clear_cache():
+    """Delete every entry of the default cache"""
+    default_cache.clear()
+
+
+def invalidate_stale():
+    """Delete default-cache entries from older versions of utils.py"""
+    return default_cache.prune_stale()
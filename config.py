@@ -60,3 +60,9 @@ VIZ_PARAMS = {
     'linewidth': 1.5,
     'figsize': (10, 6)
 }
+
+# Simulation result cache (see cache.py)
+CACHE_PARAMS = {
+    'cache_dir': '.sim_cache',
+    'max_bytes': 2 * 1024**3   # 2 GB, least recently used entries evicted first
+}
@@ -0,0 +1,678 @@
+"""
+Fixed-step integrators for the FHN ODE models
+Drop-in alternatives to scipy.integrate.odeint with the same call signature
+"""
+
+import numpy as np
+from scipy import linalg, sparse
+from scipy.sparse import linalg as sparse_linalg
+
+
+# ============================================================================
+# SINGLE STEPS
+# ============================================================================
+# Each stepper advances y by one step of size h for dy/dt = f(y, t).
+
+def euler_step(f, y, t, h):
+    """Explicit (forward) Euler step"""
+    return y + h * f(y, t)
+
+
+def heun_step(f, y, t, h):
+    """Heun's method (explicit trapezoidal / RK2)"""
+    k1 = f(y, t)
+    k2 = f(y + h * k1, t + h)
+    return y + 0.5 * h * (k1 + k2)
+
+
+def rk4_step(f, y, t, h):
+    """Classical 4th-order Runge-Kutta step"""
+    k1 = f(y, t)
+    k2 = f(y + 0.5 * h * k1, t + 0.5 * h)
+    k3 = f(y + 0.5 * h * k2, t + 0.5 * h)
+    k4 = f(y + h * k3, t + h)
+    return y + (h / 6.0) * (k1 + 2*k2 + 2*k3 + k4)
+
+
+def numerical_jacobian(f, y, t, eps=1e-7, band=None, f0=None):
+    """
+    Forward-difference Jacobian of f at (y, t)
+
+    With band = (ml, mu) only the ml sub- and mu super-diagonals are
+    estimated: columns ml + mu + 1 apart do not share a row, so they are
+    perturbed together and the whole band costs ml + mu + 1 evaluations
+    of f instead of n (as in LSODA's banded mode).
+
+    Parameters:
+    -----------
+    f : callable
+        f(y, t) -> array, shape (n,)
+    y : array, shape (n,)
+        State
+    t : float
+        Time
+    eps : float
+        Relative perturbation
+    band : tuple, optional
+        (ml, mu) lower and upper bandwidths
+    f0 : array, optional
+        f(y, t) if the caller already has it
+
+    Returns:
+    --------
+    J : array, shape (n, n), or (ml + mu + 1, n) if banded
+        J[i, j] = d f_i / d y_j; banded storage is J_band[i - j + mu, j]
+        as for odeint's Dfun with ml/mu
+    """
+    if f0 is None:
+        f0 = f(y, t)
+    n = len(y)
+    if band is None:
+        J = np.empty((len(f0), n))
+        for j in range(n):
+            dy = eps * max(1.0, abs(y[j]))
+            y_pert = y.copy()
+            y_pert[j] += dy
+            J[:, j] = (f(y_pert, t) - f0) / dy
+        return J
+
+    ml, mu = band
+    width = ml + mu + 1
+    J = np.zeros((width, n))
+    for group in range(min(width, n)):
+        cols = np.arange(group, n, width)
+        dy = eps * np.maximum(1.0, np.abs(y[cols]))
+        y_pert = y.copy()
+        y_pert[cols] += dy
+        df = f(y_pert, t) - f0
+        for j, step in zip(cols, dy):
+            rows = np.arange(max(0, j - mu), min(n, j + ml + 1))
+            J[rows - j + mu, j] = df[rows] / step
+    return J
+
+
+def semi_implicit_euler_step(f, y, t, h, jac=None, band=None):
+    """
+    Linearly implicit (Rosenbrock-Euler) step
+
+    y_{n+1} = y_n + h (I - h J)^{-1} f(y_n)
+
+    Stable for the stiff slow variables (w, M) at step sizes where
+    explicit Euler is not. J is the Jacobian at y_n, from jac(y, t) when
+    given, otherwise by finite differences. jac may return a dense
+    array, a scipy.sparse matrix (e.g. FHNNetwork.jacobian), or, with
+    band = (ml, mu), odeint's banded storage (e.g. the batched ensemble
+    Jacobians); the linear solve then stays sparse or banded. Without
+    jac or band the finite-difference Jacobian is dense and costs one
+    evaluation of f per state variable, so large batched or network
+    systems need one of the two.
+    """
+    f0 = f(y, t)
+    if jac is not None:
+        J = jac(y, t)
+    else:
+        J = numerical_jacobian(f, y, t, band=band, f0=f0)
+
+    if band is not None:
+        ml, mu = band
+        A = -h * np.asarray(J, dtype=float)
+        A[mu] += 1.0
+        return y + h * linalg.solve_banded((ml, mu), A, f0)
+    if sparse.issparse(J):
+        A = sparse.identity(len(y), format='csc') - h * J
+        return y + h * sparse_linalg.spsolve(A.tocsc(), f0)
+    A = np.eye(len(y)) - h * J
+    return y + h * np.linalg.solve(A, f0)
+
+
+STEPPERS = {
+    'euler': euler_step,
+    'heun': heun_step,
+    'rk4': rk4_step,
+    'semi_implicit_euler': semi_implicit_euler_step,
+}
+
+
+# ============================================================================
+# ODEINT-COMPATIBLE DRIVER
+# ============================================================================
+
+def odeint_fixed(func, y0, t, args=(), method='rk4', substeps=1, Dfun=None,
+                 tfirst=False, events=None, ml=None, mu=None):
+    """
+    Integrate an ODE with a fixed-step method, odeint-style
+
+    Same call signature and output as scipy.integrate.odeint, so
+    odeint(coupled_fhn_static, y0, t, args=(params,)) can be replaced by
+    odeint_fixed(coupled_fhn_static, y0, t, args=(params,)). The step
+    size is the spacing of t divided by substeps. Works unchanged with
+    the batched ensemble right-hand sides.
+
+    Parameters:
+    -----------
+    func : callable
+        func(y, t, *args) (or func(t, y, *args) if tfirst)
+    y0 : array
+        Initial state
+    t : array
+        Output time points (need not be uniform)
+    args : tuple
+        Extra arguments for func
+    method : str
+        'euler', 'heun', 'rk4' or 'semi_implicit_euler'
+    substeps : int
+        Number of integration steps between consecutive output times
+    Dfun : callable, optional
+        Jacobian Dfun(y, t, *args), used by 'semi_implicit_euler':
+        dense, scipy.sparse, or banded if ml/mu are given (defaults to
+        the analytic Jacobian in utils.JACOBIANS, if any)
+    ml, mu : int, optional
+        Lower and upper bandwidths of the Jacobian, as for odeint; with
+        ml/mu and no Dfun the finite-difference Jacobian is banded too
+    tfirst : bool
+        If True, func and Dfun take (t, y, ...) like solve_ivp
+    events : list, optional
+        ThresholdEvent / SyncThresholdEvent objects, checked after every
+        integration step; a terminal event ends the run
+
+    Returns:
+    --------
+    y : array, shape (len(t), len(y0))
+        Solution at each time in t (only the rows up to the terminal
+        event, if one fired)
+    logs : dict
+        Only if events is given: event name -> EventLog
+    """
+    if method not in STEPPERS:
+        raise ValueError(f"Unknown method '{method}', expected one of {tuple(STEPPERS)}")
+    if substeps < 1:
+        raise ValueError(f"substeps must be >= 1, got {substeps}")
+
+    if method == 'semi_implicit_euler' and Dfun is None and not tfirst:
+        # Use the model's analytic Jacobian (dense or banded) when there is one
+        from utils import JACOBIANS
+        if func in JACOBIANS and ml is None and mu is None:
+            Dfun, band = JACOBIANS[func]
+            if band is not None:
+                ml, mu = band
+    band = None
+    if ml is not None or mu is not None:
+        band = (ml or 0, mu or 0)
+
+    def f(y, tt):
+        if tfirst:
+            return np.asarray(func(tt, y, *args), dtype=float)
+        return np.asarray(func(y, tt, *args), dtype=float)
+
+    def jac(y, tt):
+        J = Dfun(tt, y, *args) if tfirst else Dfun(y, tt, *args)
+        return J if sparse.issparse(J) else np.asarray(J, dtype=float)
+
+    stepper = STEPPERS[method]
+
+    def step(y, tt, h):
+        if method == 'semi_implicit_euler':
+            return stepper(f, y, tt, h, jac=jac if Dfun is not None else None, band=band)
+        return stepper(f, y, tt, h)
+
+    t = np.asarray(t, dtype=float)
+    y = np.array(y0, dtype=float)
+    out = np.empty((len(t), len(y)))
+    for event in events or ():
+        event.reset()
+    if len(t) == 0:
+        return out if events is None else (out, {})
+    out[0] = y
+
+    n_done = len(t)
+    for i in range(len(t) - 1):
+        h = (t[i+1] - t[i]) / substeps
+        tt = t[i]
+        stop = False
+        for _ in range(substeps):
+            y_next = step(y, tt, h)
+            if events:
+                stop = _check_events(events, np.array([tt, tt + h]), np.array([y, y_next])) >= 0
+            y = y_next
+            tt += h
+            if stop:
+                break
+        out[i+1] = y
+        if stop:
+            n_done = i + 2
+            break
+
+    if events is None:
+        return out
+    return out[:n_done], {event.name: event.log for event in events}
+
+
+# ============================================================================
+# EVENTS (threshold crossings recorded during integration)
+# ============================================================================
+# An event is checked on consecutive evaluated points ts[0] < ts[1] < ...
+# with states ys, and records crossings located by linear interpolation
+# between neighbouring points. Each event keeps its own EventLog of
+# crossing times and the ids of the components that crossed; a terminal
+# event ends the run.
+
+class EventLog:
+    """
+    Growable record of event times (float64) and component ids (int32)
+
+    Storage doubles when full, so recording is amortised O(1) and the
+    final arrays hold only the events (no dense time series).
+    """
+
+    def __init__(self, capacity=64):
+        self._times = np.empty(capacity)
+        self._ids = np.empty(capacity, dtype=np.int32)
+        self.count = 0
+
+    def extend(self, times, ids):
+        n = len(times)
+        if self.count + n > len(self._times):
+            size = max(2 * len(self._times), self.count + n)
+            self._times = np.resize(self._times, size)
+            self._ids = np.resize(self._ids, size)
+        self._times[self.count:self.count + n] = times
+        self._ids[self.count:self.count + n] = ids
+        self.count += n
+
+    def truncate(self, t_max):
+        """Drop events after t_max (recorded past a terminal event)"""
+        self.count = int(np.sum(self.times <= t_max))
+
+    @property
+    def times(self):
+        return self._times[:self.count]
+
+    @property
+    def ids(self):
+        return self._ids[:self.count]
+
+    def times_of(self, component_id):
+        """Event times of one component (e.g. the spike train of one neuron)"""
+        return self.times[self.ids == component_id]
+
+
+class ThresholdEvent:
+    """
+    Crossing of a level by one or several state components
+
+    Examples: spikes are upward crossings of v, ThresholdEvent('spike',
+    [0, 2], 1.0) for teacher and student; time-to-learn is
+    ThresholdEvent('learned', 4, 0.95, once=True, terminal=True).
+
+    Parameters:
+    -----------
+    name : str
+        Key of the event in the returned logs
+    index : int or array of int
+        State component(s) to watch; ids in the log refer to positions
+        in this list
+    level : float
+        Threshold
+    direction : int
+        +1 upward crossings, -1 downward, 0 both
+    once : bool
+        Record only the first crossing of each component
+    terminal : bool
+        Stop the integration at the first recorded crossing
+    """
+
+    def __init__(self, name, index, level, direction=1, once=False, terminal=False):
+        self.name = name
+        self.index = np.atleast_1d(np.asarray(index, dtype=int))
+        self.level = level
+        self.direction = direction
+        self.once = once
+        self.terminal = terminal
+
+    def reset(self):
+        self.log = EventLog()
+        self._fired = np.zeros(len(self.index), dtype=bool)
+
+    def check(self, ts, ys):
+        """
+        Record crossings between consecutive points
+
+        Parameters:
+        -----------
+        ts : array, shape (m + 1,)
+            Increasing times
+        ys : array, shape (m + 1, dim)
+            States at ts
+
+        Returns:
+        --------
+        stop : int
+            Segment (ts[stop], ts[stop+1]] in which a terminal crossing
+            happened, or -1
+        """
+        return self._record(ts, np.asarray(ys)[:, self.index])
+
+    def _record(self, ts, values):
+        a = values[:-1] - self.level
+        b = values[1:] - self.level
+        up = (a < 0) & (b >= 0)
+        down = (a > 0) & (b <= 0)
+        hit = up if self.direction > 0 else down if self.direction < 0 else up | down
+        if self.once:
+            hit &= (np.cumsum(hit, axis=0) == 1) & ~self._fired
+        if not hit.any():
+            return -1
+
+        seg, ids = np.nonzero(hit)
+        frac = a[seg, ids] / (a[seg, ids] - b[seg, ids])
+        self.log.extend(ts[seg] + frac * (ts[seg + 1] - ts[seg]), ids)
+        self._fired[ids] = True
+        return int(seg[0]) if self.terminal else -1
+
+
+def milestone_events(index, levels, name='M', terminal_level=None):
+    """
+    One-shot upward ThresholdEvents for a set of levels of one variable
+
+    E.g. milestone_events(4, [0.5, 0.8, 0.95], terminal_level=0.95) gives
+    the times at which the synaptic weight M first reaches each level
+    and stops the run at M = 0.95.
+
+    Returns:
+    --------
+    events : list of ThresholdEvent
+        Named f"{name}>={level}"
+    """
+    return [ThresholdEvent(f"{name}>={level}", index, level, direction=1, once=True,
+                           terminal=(level == terminal_level))
+            for level in levels]
+
+
+class SyncThresholdEvent(ThresholdEvent):
+    """
+    Sliding-window correlation of two components crossing a level
+
+    |corr(y_i, y_j)| over the last window evaluated points (the
+    synchronization_index of a rolling window) is updated in O(1) per
+    point from running sums. Nothing is recorded until the window is
+    full.
+
+    Parameters:
+    -----------
+    name : str
+        Key of the event in the returned logs
+    i, j : int
+        State components (e.g. 0 and 2 for v1 and v2)
+    window : int
+        Window length in evaluated points
+    level : float
+        Synchronization threshold
+    direction, once, terminal
+        As for ThresholdEvent
+    """
+
+    def __init__(self, name, i, j, window, level, direction=1, once=False, terminal=False):
+        super().__init__(name, [0], level, direction, once, terminal)
+        self.i, self.j = i, j
+        self.window = window
+
+    def reset(self):
+        super().reset()
+        self._buffer = np.zeros((self.window, 2))
+        self._sums = np.zeros(5)
+        self._n = 0
+        self._value = np.nan
+
+    def _push(self, x, z):
+        """Add a point to the window and return the new |corr|"""
+        k = self._n % self.window
+        if self._n >= self.window:
+            xo, zo = self._buffer[k]
+            self._sums -= (xo, zo, xo*xo, zo*zo, xo*zo)
+        self._buffer[k] = x, z
+        self._sums += (x, z, x*x, z*z, x*z)
+        self._n += 1
+        if self._n < self.window:
+            return np.nan
+
+        sx, sz, sxx, szz, sxz = self._sums / self.window
+        var = (sxx - sx*sx) * (szz - sz*sz)
+        return abs(sxz - sx*sz) / np.sqrt(var) if var > 0 else np.nan
+
+    def check(self, ts, ys):
+        ys = np.asarray(ys)
+        if self._n == 0:
+            self._value = self._push(ys[0, self.i], ys[0, self.j])
+        values = np.empty((len(ts), 1))
+        values[0] = self._value
+        for k in range(1, len(ts)):
+            values[k] = self._push(ys[k, self.i], ys[k, self.j])
+        self._value = values[-1, 0]
+        # NaN (window not yet full) compares False, so it never crosses
+        return self._record(ts, values)
+
+
+def _check_events(events, ts, ys):
+    """Run all events on a block of points; returns the stop segment or -1"""
+    stops = [event.check(ts, ys) for event in events]
+    stops = [stop for stop in stops if stop >= 0]
+    if not stops:
+        return -1
+    stop = min(stops)
+    for event in events:
+        event.log.truncate(ts[stop + 1])
+    return stop
+
+
+def odeint_events(func, y0, t, events, args=(), method='LSODA', Dfun=None,
+                  check_every=100, **options):
+    """
+    Integrate with an adaptive solver while recording events
+
+    Like odeint, but the run is driven step by step (scipy's LSODA, BDF,
+    RK45, ... solver classes) so threshold crossings are recorded as the
+    integration proceeds and a terminal event stops it early. Events are
+    checked between consecutive points of the output grid t, interpolated
+    from the solver's dense output.
+
+    Parameters:
+    -----------
+    func : callable
+        func(y, t, *args), as for odeint
+    y0 : array
+        Initial state
+    t : array
+        Output time points
+    events : list
+        ThresholdEvent / SyncThresholdEvent objects
+    args : tuple
+        Extra arguments for func
+    method : str
+        Solver class name from scipy.integrate ('LSODA', 'BDF', 'RK45', ...)
+    Dfun : callable, optional
+        Jacobian Dfun(y, t, *args) (defaults to the analytic Jacobian in
+        utils.JACOBIANS, if any); used by BDF, Radau and LSODA only
+    check_every : int
+        Output points collected before the events are run on them; a
+        terminal event may let the solver run up to this many points
+        past it, but the returned solution ends at the event
+    **options
+        Passed to the solver; rtol and atol default to odeint's 1.49e-8
+
+    Returns:
+    --------
+    y : array, shape (n_done, len(y0))
+        Solution at t[:n_done] (n_done < len(t) if a terminal event fired)
+    logs : dict
+        Event name -> EventLog with .times and .ids
+    """
+    from scipy import integrate
+
+    if Dfun is None:
+        from utils import JACOBIANS
+        jac_func, band = JACOBIANS.get(func, (None, None))
+        if band is None:
+            Dfun = jac_func
+    # Only the implicit solvers take a Jacobian; the explicit ones warn
+    if Dfun is not None and method in ('BDF', 'Radau', 'LSODA'):
+        options['jac'] = lambda tt, y: Dfun(y, tt, *args)
+    options.setdefault('rtol', 1.49012e-8)
+    options.setdefault('atol', 1.49012e-8)
+
+    t = np.asarray(t, dtype=float)
+    y0 = np.asarray(y0, dtype=float)
+    out = np.empty((len(t), len(y0)))
+    for event in events:
+        event.reset()
+    if len(t) == 0:
+        return out, {event.name: event.log for event in events}
+    out[0] = y0
+
+    solver = getattr(integrate, method)(lambda tt, y: func(y, tt, *args), t[0], y0, t[-1],
+                                        **options)
+    k = 1          # next output time to fill
+    k_checked = 1  # next output time not yet seen by the events
+    while k_checked < len(t):
+        message = solver.step()
+        if solver.status == 'failed':
+            raise RuntimeError(f"Integration failed at t={solver.t}: {message}")
+
+        # Output times covered by this step
+        finished = solver.status == 'finished'
+        k_end = len(t) if finished else np.searchsorted(t, solver.t, side='right')
+        if k_end > k:
+            out[k:k_end] = solver.dense_output()(t[k:k_end]).T
+            k = k_end
+
+        # Events are checked in blocks of output points to keep the
+        # per-step overhead low; a terminal event still truncates exactly
+        if k - k_checked >= check_every or (finished and k > k_checked):
+            stop = _check_events(events, t[k_checked-1:k], out[k_checked-1:k])
+            if stop >= 0:
+                k = k_checked + stop + 1
+                break
+            k_checked = k
+
+    return out[:k], {event.name: event.log for event in events}
+
+
+# ============================================================================
+# STOCHASTIC INTEGRATORS (diagonal noise)
+# ============================================================================
+# dy = f(y, t) dt + g(y, t) dW with independent Wiener increments for each
+# state component. Many realisations are integrated together: internally
+# the state has shape (dim, n_paths), so right-hand sides written for a
+# single state (v1, w1, ... = state) work unchanged on whole batches.
+
+def _path_generators(seed, n_paths):
+    """One independent generator per realisation, derived from seed"""
+    children = np.random.SeedSequence(seed).spawn(n_paths)
+    return [np.random.default_rng(child) for child in children]
+
+
+def _diffusion_derivative(g, y, t, eps=1e-7):
+    """Finite-difference d g_i / d y_i for diagonal noise"""
+    g0 = g(y, t)
+    dg = np.empty_like(y)
+    for i in range(len(y)):
+        y_pert = y.copy()
+        y_pert[i] += eps
+        dg[i] = (np.broadcast_to(g(y_pert, t), y.shape)[i] - np.broadcast_to(g0, y.shape)[i]) / eps
+    return dg
+
+
+def sdeint(drift, diffusion, y0, t, args=(), method='euler_maruyama', n_paths=None,
+           seed=None, substeps=1, block_size=1000, diffusion_deriv=None):
+    """
+    Integrate an SDE with diagonal noise over many realisations at once
+
+    Noise increments are drawn in bulk, one block of steps at a time,
+    from a separate seeded stream per realisation: path p is the same
+    whether it is run alone or as part of a larger batch.
+
+    Parameters:
+    -----------
+    drift : callable
+        drift(y, t, *args), deterministic part (e.g. coupled_fhn_plastic)
+    diffusion : callable
+        diffusion(y, t, *args), noise amplitude per component; may return
+        a scalar or anything broadcastable to y
+    y0 : array, shape (dim,)
+        Initial state, shared by all realisations
+    t : array
+        Output time points
+    args : tuple
+        Extra arguments for drift and diffusion
+    method : str
+        'euler_maruyama' (strong order 0.5) or 'milstein' (strong order 1)
+    n_paths : int, optional
+        Number of independent realisations; None for a single path
+    seed : int, optional
+        Seed for the noise streams
+    substeps : int
+        Integration steps between consecutive output times
+    block_size : int
+        Number of steps of noise generated at a time
+    diffusion_deriv : callable, optional
+        d g_i / d y_i for 'milstein' (finite differences if omitted)
+
+    Returns:
+    --------
+    y : array, shape (len(t), n_paths, dim), or (len(t), dim) if n_paths
+        is None
+    """
+    if method not in ('euler_maruyama', 'milstein'):
+        raise ValueError(f"Unknown method '{method}', expected 'euler_maruyama' or 'milstein'")
+    if substeps < 1:
+        raise ValueError(f"substeps must be >= 1, got {substeps}")
+
+    single = n_paths is None
+    n_paths = 1 if single else n_paths
+
+    def f(y, tt):
+        return np.asarray(drift(y, tt, *args), dtype=float)
+
+    def g(y, tt):
+        return np.asarray(diffusion(y, tt, *args), dtype=float)
+
+    def dg(y, tt):
+        if diffusion_deriv is None:
+            return _diffusion_derivative(g, y, tt)
+        return np.asarray(diffusion_deriv(y, tt, *args), dtype=float)
+
+    t = np.asarray(t, dtype=float)
+    y0 = np.asarray(y0, dtype=float)
+    dim = len(y0)
+    y = np.repeat(y0[:, None], n_paths, axis=1)
+
+    out = np.empty((len(t), n_paths, dim))
+    if len(t) == 0:
+        return out[:, 0] if single else out
+    out[0] = y.T
+
+    generators = _path_generators(seed, n_paths)
+    noise = np.empty((block_size, dim, n_paths))
+    k = block_size
+
+    for i in range(len(t) - 1):
+        h = (t[i+1] - t[i]) / substeps
+        sqrt_h = np.sqrt(h)
+        tt = t[i]
+        for _ in range(substeps):
+            if k == block_size:
+                # Standard normals for the next block of steps, per path
+                for p, gen in enumerate(generators):
+                    noise[:, :, p] = gen.standard_normal((block_size, dim))
+                k = 0
+            dW = sqrt_h * noise[k]
+            k += 1
+
+            gy = g(y, tt)
+            y_next = y + h * f(y, tt) + gy * dW
+            if method == 'milstein':
+                y_next = y_next + 0.5 * gy * dg(y, tt) * (dW**2 - h)
+            y = y_next
+            tt += h
+        out[i+1] = y.T
+
+    return out[:, 0] if single else out
@@ -0,0 +1,629 @@
+"""
+Analysis tools for the discrete memristive FHN map
+Most routines iterate many parameter values / initial conditions as one batch
+"""
+
+import warnings
+
+import numpy as np
+
+from accel import iterate_memristive_fhn_fast
+from utils import (broadcast_map_batch, broadcast_map_params, memristive_fhn_map_batch,
+                   memristive_fhn_jacobian_batch)
+
+
+# ============================================================================
+# PARAMETER PLANES
+# ============================================================================
+
+def mesh_params(base_params, x_name, x_values, y_name, y_values):
+    """Flattened (len(y_values) * len(x_values)) parameter arrays, x fastest"""
+    X, Y = np.meshgrid(np.asarray(x_values, dtype=float), np.asarray(y_values, dtype=float))
+    params = dict(base_params)
+    params[x_name] = X.ravel()
+    params[y_name] = Y.ravel()
+    return params, X.shape
+
+
+def evaluate_plane(func, base_params, x_name, x_values, y_name, y_values, batch_size=20000):
+    """
+    Evaluate a batched map analysis over a 2D parameter plane in chunks
+
+    Parameters:
+    -----------
+    func : callable
+        func(params) -> array, or tuple of arrays, with one row per cell
+        of params (whose swept entries are per-cell arrays)
+    base_params : dict
+        Fixed map parameters
+    x_name, y_name : str
+        Swept parameter names (e.g. 'theta', 'k1')
+    x_values, y_values : array
+        Values along each axis
+    batch_size : int
+        Number of cells evaluated together (bounds memory use)
+
+    Returns:
+    --------
+    result : array, or tuple of arrays, shape (len(y_values), len(x_values), ...)
+        func's output per cell, x varying along columns
+    """
+    params, shape = mesh_params(base_params, x_name, x_values, y_name, y_values)
+    n_cells = shape[0] * shape[1]
+    results = None
+
+    for start in range(0, n_cells, batch_size):
+        stop = min(start + batch_size, n_cells)
+        chunk = {key: (np.asarray(value)[start:stop] if np.ndim(value) else value)
+                 for key, value in params.items()}
+        output = func(chunk)
+        single = not isinstance(output, tuple)
+        parts = [np.asarray(part) for part in ((output,) if single else output)]
+        if results is None:
+            results = [np.empty((n_cells,) + part.shape[1:], dtype=part.dtype) for part in parts]
+        for result, part in zip(results, parts):
+            result[start:stop] = part
+
+    results = [result.reshape(shape + result.shape[1:]) for result in results]
+    return results[0] if single else tuple(results)
+
+
+# ============================================================================
+# LYAPUNOV SPECTRUM (tangent-space QR method)
+# ============================================================================
+
+def _gram_schmidt(Q):
+    """
+    Batched QR of 3xk matrices by modified Gram-Schmidt
+
+    Parameters:
+    -----------
+    Q : array, shape (N, 3, k)
+        Tangent vectors as columns
+
+    Returns:
+    --------
+    Q : array, shape (N, 3, k)
+        Orthonormalised columns
+    r : array, shape (N, k)
+        Diagonal of R (stretching factors along each direction)
+    """
+    q = np.empty_like(Q)
+    r = np.empty((Q.shape[0], Q.shape[2]))
+    for j in range(Q.shape[2]):
+        v = Q[:, :, j].copy()
+        for i in range(j):
+            v -= np.sum(q[:, :, i] * v, axis=1)[:, None] * q[:, :, i]
+        r[:, j] = np.sqrt(np.sum(v * v, axis=1))
+        q[:, :, j] = v / r[:, j][:, None]
+    return q, r
+
+
+def tangent_lyapunov(states, param_arrays, n_steps, qr_every=1, n_exponents=3):
+    """
+    Lyapunov exponents from tangent vectors evolved along N trajectories
+
+    The core of lyapunov_spectrum, for states already on the attractor.
+    With n_exponents=1 a single tangent vector is evolved, which gives
+    the largest exponent for about a third of the cost.
+
+    Parameters:
+    -----------
+    states : array, shape (N, 3)
+        Current [x, y, z] of each trajectory
+    param_arrays : dict
+        Parameter arrays of shape (N,), see utils.broadcast_map_params
+    n_steps : int
+        Number of steps over which the exponents are averaged
+    qr_every : int
+        Steps between re-orthonormalisations
+    n_exponents : int
+        Number of leading exponents (1 to 3)
+
+    Returns:
+    --------
+    exponents : array, shape (N, n_exponents)
+        Exponents in decreasing order (NaN if the trajectory diverged)
+    states : array, shape (N, 3)
+        States after the n_steps iterations
+    """
+    n = len(states)
+    Q = np.broadcast_to(np.eye(3)[:, :n_exponents], (n, 3, n_exponents)).copy()
+    log_sum = np.zeros((n, n_exponents))
+
+    with np.errstate(invalid='ignore', over='ignore', divide='ignore'):
+        for i in range(n_steps):
+            J = memristive_fhn_jacobian_batch(states, param_arrays)
+            states = memristive_fhn_map_batch(states, param_arrays)
+            Q = J @ Q
+            if (i + 1) % qr_every == 0 or i == n_steps - 1:
+                Q, r = _gram_schmidt(Q)
+                log_sum += np.log(r)
+
+        exponents = log_sum / max(n_steps, 1)
+        exponents[~np.isfinite(states).all(axis=1)] = np.nan
+
+    return -np.sort(-exponents, axis=1), states
+
+
+def lyapunov_spectrum(initial_states, params, n_steps, transient=1000, qr_every=1):
+    """
+    Lyapunov spectrum of the memristive FHN map for N trajectories
+
+    Tangent vectors are evolved with the analytic map Jacobian alongside
+    the trajectory and re-orthonormalised (QR) every qr_every steps; the
+    exponents are the average log stretching factors.
+
+    Parameters:
+    -----------
+    initial_states : array, shape (N, 3) or (3,)
+        Initial [x, y, z] for each trajectory
+    params : dict
+        Map parameters; each value is a scalar or an array of shape (N,)
+    n_steps : int
+        Number of steps over which the exponents are averaged
+    transient : int
+        Steps iterated first to land on the attractor
+    qr_every : int
+        Steps between re-orthonormalisations
+
+    Returns:
+    --------
+    exponents : array, shape (N, 3)
+        Lyapunov exponents in decreasing order (NaN if the trajectory
+        diverged)
+    """
+    state, param_arrays = broadcast_map_batch(initial_states, params)
+
+    for _ in range(transient):
+        state = memristive_fhn_map_batch(state, param_arrays)
+
+    return tangent_lyapunov(state, param_arrays, n_steps, qr_every)[0]
+
+
+def largest_lyapunov_exponent(initial_state, params, n_steps, transient=1000, qr_every=1):
+    """Largest Lyapunov exponent of a single trajectory (see lyapunov_spectrum)"""
+    return lyapunov_spectrum(initial_state, params, n_steps, transient, qr_every)[0, 0]
+
+
+def lyapunov_heatmap(base_params, x_name, x_values, y_name, y_values,
+                     initial_state=(0.01, 0.02, 0.1), n_steps=2000, transient=1000,
+                     qr_every=1, batch_size=20000):
+    """
+    Largest Lyapunov exponent over a 2D parameter plane, e.g. (theta, k1)
+
+    Parameters:
+    -----------
+    base_params : dict
+        Fixed map parameters
+    x_name, y_name : str
+        Swept parameter names (e.g. 'theta', 'k1')
+    x_values, y_values : array
+        Values along each axis
+    initial_state : array, shape (3,)
+        Initial [x, y, z] for every cell
+    n_steps, transient, qr_every : int
+        As for lyapunov_spectrum
+    batch_size : int
+        Number of cells iterated together (bounds memory use)
+
+    Returns:
+    --------
+    lam_max : array, shape (len(y_values), len(x_values))
+        Largest exponent per cell (> 0 chaotic, NaN diverged)
+    """
+    return evaluate_plane(
+        lambda chunk: lyapunov_spectrum(initial_state, chunk, n_steps, transient, qr_every)[:, 0],
+        base_params, x_name, x_values, y_name, y_values, batch_size)
+
+
+# ============================================================================
+# BIFURCATION DENSITY IMAGES
+# ============================================================================
+
+# Sweeping one of these varies the initial state instead of a parameter
+INITIAL_STATE_KEYS = ('x0', 'y0', 'z0')
+
+
+def _sweep_setup(base_params, param_name, param_values, initial_state):
+    """Per-column parameters and initial states for a 1D sweep"""
+    param_values = np.asarray(param_values, dtype=float)
+    n = len(param_values)
+    states = np.array(np.broadcast_to(np.asarray(initial_state, dtype=float), (n, 3)))
+    params = dict(base_params)
+    if param_name in INITIAL_STATE_KEYS:
+        states[:, INITIAL_STATE_KEYS.index(param_name)] = param_values
+    else:
+        params[param_name] = param_values
+    return broadcast_map_params(params, n), states
+
+
+def bifurcation_density(base_params, param_name, param_values,
+                        initial_state=(0.01, 0.02, 0.1), n_steps=4000, transient=2000,
+                        variable=0, n_bins=500, value_range=None, block=100,
+                        pilot_steps=200):
+    """
+    Bifurcation diagram as a 2D histogram (state bin x parameter value)
+
+    All parameter values are iterated together as one batch and every
+    post-transient state is binned on the fly, so memory depends on the
+    image size rather than on the number of steps.
+
+    Parameters:
+    -----------
+    base_params : dict
+        Fixed map parameters
+    param_name : str
+        Swept parameter ('theta', 'k1', ...) or initial-state component
+        ('x0', 'y0', 'z0')
+    param_values : array, shape (P,)
+        Values of the swept parameter (one image column each)
+    initial_state : array, shape (3,)
+        Initial [x, y, z] (the swept component is overridden for 'z0' etc.)
+    n_steps : int
+        Total iterations per column
+    transient : int
+        Iterations discarded before binning
+    variable : int
+        State variable on the vertical axis (0=x, 1=y, 2=z)
+    n_bins : int
+        Number of vertical bins
+    value_range : tuple, optional
+        (low, high) of the vertical axis, low < high; estimated from the
+        first pilot_steps post-transient states if omitted. States
+        outside it are not binned but counted in outside
+    block : int
+        Steps collected before each histogram update
+    pilot_steps : int
+        Steps used to estimate value_range
+
+    Returns:
+    --------
+    density : array, shape (n_bins, P)
+        Visit counts (diverged columns stay empty)
+    value_edges : array, shape (n_bins + 1,)
+        Bin edges of the vertical axis
+    outside : array of int, shape (P,)
+        Finite post-transient states per column that fell outside the
+        vertical range (non-zero means the pilot range was too narrow:
+        pass value_range or raise pilot_steps)
+    """
+    if value_range is not None and not value_range[0] < value_range[1]:
+        raise ValueError(f"value_range must satisfy low < high, got {tuple(value_range)}")
+
+    param_arrays, state = _sweep_setup(base_params, param_name, param_values, initial_state)
+    n_params = len(state)
+    n_record = max(n_steps - transient, 0)
+
+    with np.errstate(invalid='ignore', over='ignore'):
+        for _ in range(min(transient, n_steps)):
+            state = memristive_fhn_map_batch(state, param_arrays)
+
+        # Pilot block: kept in memory only to fix the vertical range
+        pilot = np.empty((min(pilot_steps, n_record) if value_range is None else 0, n_params))
+        for i in range(len(pilot)):
+            state = memristive_fhn_map_batch(state, param_arrays)
+            pilot[i] = state[:, variable]
+
+    if value_range is None:
+        finite = pilot[np.isfinite(pilot)]
+        if finite.size == 0:
+            low, high = -1.0, 1.0
+        else:
+            low, high = finite.min(), finite.max()
+            pad = 0.05 * (high - low) if high > low else 0.5
+            low, high = low - pad, high + pad
+    else:
+        low, high = value_range
+
+    value_edges = np.linspace(low, high, n_bins + 1)
+    counts = np.zeros(n_params * n_bins, dtype=np.int64)
+    outside = np.zeros(n_params, dtype=np.int64)
+    column_offset = np.arange(n_params) * n_bins
+
+    def accumulate(values):
+        bins = np.floor((values - low) / (high - low) * n_bins)
+        # Last bin closed on the right, as in np.histogram
+        bins[(bins == n_bins) & (values <= high)] = n_bins - 1
+        finite = np.isfinite(bins)
+        valid = finite & (bins >= 0) & (bins < n_bins)
+        outside[:] += (finite & ~valid).sum(axis=0)
+        idx = (column_offset + np.where(valid, bins, 0).astype(np.int64))[valid]
+        counts[:] += np.bincount(idx, minlength=n_params * n_bins)
+
+    if len(pilot):
+        accumulate(pilot)
+
+    buffer = np.empty((block, n_params))
+    k = 0
+    with np.errstate(invalid='ignore', over='ignore'):
+        for _ in range(n_record - len(pilot)):
+            state = memristive_fhn_map_batch(state, param_arrays)
+            buffer[k] = state[:, variable]
+            k += 1
+            if k == block:
+                accumulate(buffer)
+                k = 0
+        if k:
+            accumulate(buffer[:k])
+
+    density = counts.reshape(n_params, n_bins).T
+    return density, value_edges, outside
+
+
+# ============================================================================
+# CONTINUATION SWEEPS (warm start from the previous attractor)
+# ============================================================================
+
+def _settle(state, params, window, min_transient, max_transient, tol, variable):
+    """
+    Iterate until the attractor statistics stop changing
+
+    Consecutive windows are compared on the mean and standard deviation
+    of one variable; the run is considered settled when both change by
+    less than tol times the spread of the signal.
+
+    Returns:
+    --------
+    state : array, shape (3,)
+        State after the transient
+    n_transient : int
+        Number of transient steps used
+    """
+    previous = None
+    n_done = 0
+    while n_done < max_transient:
+        block = iterate_memristive_fhn_fast(state, params, min(window, max_transient - n_done))
+        n_done += len(block)
+        state = block[-1]
+        if not np.all(np.isfinite(state)):
+            break
+
+        values = block[:, variable]
+        stats = (values.mean(), values.std())
+        if previous is not None and n_done >= min_transient:
+            scale = max(stats[1], previous[1], 1e-9)
+            if (abs(stats[0] - previous[0]) <= tol * scale
+                    and abs(stats[1] - previous[1]) <= tol * scale):
+                break
+        previous = stats
+
+    return state, n_done
+
+
+def _continuation_pass(base_params, param_name, param_values, order, initial_state,
+                       n_record, window, min_transient, max_transient, tol, variable):
+    param_values = np.asarray(param_values, dtype=float)
+    values = np.full((len(param_values), n_record), np.nan)
+    n_transient = np.zeros(len(param_values), dtype=int)
+    initial_state = np.asarray(initial_state, dtype=float)
+    state = initial_state
+
+    for idx in order:
+        params = dict(base_params)
+        if param_name in INITIAL_STATE_KEYS:
+            # Sweeping an initial condition: every run restarts there
+            state = initial_state.copy()
+            state[INITIAL_STATE_KEYS.index(param_name)] = param_values[idx]
+        else:
+            params[param_name] = param_values[idx]
+
+        if not np.all(np.isfinite(state)):
+            # Previous run diverged: nothing to continue from
+            state = initial_state
+
+        state, n_transient[idx] = _settle(state, params, window, min_transient,
+                                          max_transient, tol, variable)
+        if n_record > 0 and np.all(np.isfinite(state)):
+            traj = iterate_memristive_fhn_fast(state, params, n_record)
+            values[idx] = traj[:, variable]
+            state = traj[-1]
+
+    return {'param_values': param_values, 'values': values, 'transient': n_transient}
+
+
+def continuation_sweep(base_params, param_name, param_values,
+                       initial_state=(0.01, 0.02, 0.1), n_record=2000, direction='both',
+                       window=100, min_transient=200, max_transient=2000, tol=0.1,
+                       variable=0):
+    """
+    Bifurcation sweep that warm-starts each value from the previous attractor
+
+    The final state for one parameter value is the initial state for the
+    next, and the transient is cut short as soon as the attractor
+    statistics settle: with the defaults a run takes 200-400 transient
+    steps instead of a fixed 2000. Running the sweep forward and backward follows
+    each branch as far as it exists, exposing hysteresis and coexisting
+    attractors (e.g. the z0=0.1 vs z0=4.0 branches of Figure 8).
+
+    Parameters:
+    -----------
+    base_params : dict
+        Fixed map parameters
+    param_name : str
+        Swept parameter ('theta', 'k1', ...); sweeping 'x0', 'y0' or
+        'z0' restarts every run from that initial condition
+    param_values : array, shape (P,)
+        Values in increasing order
+    initial_state : array, shape (3,)
+        Initial [x, y, z] of the first run (and after a divergence)
+    n_record : int
+        Post-transient states recorded per value
+    direction : str
+        'forward', 'backward' or 'both'
+    window : int
+        Window length for the convergence test
+    min_transient, max_transient : int
+        Bounds on the transient length; the transient is a whole number
+        of windows and at least two, since settling compares consecutive
+        windows
+    tol : float
+        Relative change in window mean/std below which a run has settled
+    variable : int
+        State variable recorded and tested (0=x, 1=y, 2=z)
+
+    Returns:
+    --------
+    result : dict, or (forward, backward) dicts for direction='both'
+        'param_values' (P,), 'values' (P, n_record) of the recorded
+        variable (NaN if diverged) and 'transient' (P,) steps used;
+        rows are in param_values order for both directions
+    """
+    if direction not in ('forward', 'backward', 'both'):
+        raise ValueError(f"Unknown direction '{direction}'")
+
+    n = len(param_values)
+    args = (initial_state, n_record, window, min_transient, max_transient, tol, variable)
+    forward = backward = None
+    if direction in ('forward', 'both'):
+        forward = _continuation_pass(base_params, param_name, param_values, range(n), *args)
+    if direction in ('backward', 'both'):
+        backward = _continuation_pass(base_params, param_name, param_values,
+                                      range(n - 1, -1, -1), *args)
+
+    if direction == 'both':
+        return forward, backward
+    return forward if direction == 'forward' else backward
+
+
+def branch_difference(forward, backward):
+    """
+    Distance between forward and backward branches at each parameter value
+
+    Large values mark hysteresis / coexisting attractors.
+
+    Returns:
+    --------
+    diff : array, shape (P,)
+        |mean_forward - mean_backward| of the recorded variable
+    """
+    with warnings.catch_warnings():
+        # Columns where a branch diverged are all-NaN
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        return np.abs(np.nanmean(forward['values'], axis=1) - np.nanmean(backward['values'], axis=1))
+
+
+# ============================================================================
+# BASINS OF ATTRACTION
+# ============================================================================
+
+# Basin labels that are not attractor indices
+DIVERGED = -1
+UNRESOLVED = -2
+
+
+def _match_catalogue(fp, catalogue_fp, tol):
+    """Index of the first catalogued fingerprint within tol of each row (-1 if none)"""
+    if len(catalogue_fp) == 0:
+        return np.full(len(fp), -1)
+    close = (np.abs(fp[:, None, :] - np.asarray(catalogue_fp)[None, :, :]) <= tol).all(axis=2)
+    return np.where(close.any(axis=1), close.argmax(axis=1), -1)
+
+
+def basin_map(params, x0_values, z0_values, y0=0.02, window=500, min_transient=1000,
+              max_steps=20000, tol=(0.15, 0.15, 0.5)):
+    """
+    Basins of attraction of the memristive FHN map over a (z0, x0) grid
+
+    All initial conditions are iterated as one batch in windows of
+    `window` steps. Each window is summarised by a compact fingerprint
+    (mean x, std x, mean z). After min_transient steps, a trajectory
+    whose fingerprint matches a catalogued attractor is labelled and
+    stops iterating; one whose fingerprint has stopped changing but
+    matches nothing is added to the catalogue as a new attractor.
+
+    Parameters:
+    -----------
+    params : dict
+        Map parameters
+    x0_values : array, shape (R,)
+        Initial membrane potentials (image rows)
+    z0_values : array, shape (C,)
+        Initial memristor states (image columns)
+    y0 : float
+        Initial recovery variable for every cell
+    window : int
+        Steps per fingerprint window
+    min_transient : int
+        Steps before any trajectory may be classified
+    max_steps : int
+        Hard limit; trajectories still unsettled are labelled UNRESOLVED
+    tol : tuple of 3 floats
+        Absolute tolerances on (mean x, std x, mean z) for two
+        fingerprints to be the same attractor
+
+    Returns:
+    --------
+    labels : array of int, shape (R, C)
+        Attractor index per cell, DIVERGED (-1) or UNRESOLVED (-2)
+    catalogue : list of dict
+        One entry per attractor: 'label', 'fingerprint' (mean x, std x,
+        mean z), 'initial_state' (first cell that reached it),
+        'n_cells' and 'steps' (steps that cell needed)
+    """
+    tol = np.asarray(tol, dtype=float)
+    X0, Z0 = np.meshgrid(np.asarray(x0_values, dtype=float),
+                         np.asarray(z0_values, dtype=float), indexing='ij')
+    n = X0.size
+    initial = np.column_stack([X0.ravel(), np.full(n, y0), Z0.ravel()])
+    param_arrays = broadcast_map_params(params, 1)
+    scalar_params = {key: value[0] for key, value in param_arrays.items()}
+
+    state = initial.copy()
+    labels = np.full(n, UNRESOLVED)
+    previous_fp = np.full((n, 3), np.nan)
+    catalogue_fp = []
+    catalogue = []
+    active = np.arange(n)
+    steps = 0
+
+    with np.errstate(invalid='ignore', over='ignore'):
+        while active.size and steps < max_steps:
+            s = state[active]
+            sums = np.zeros((len(active), 3))
+            for _ in range(window):
+                s = memristive_fhn_map_batch(s, scalar_params)
+                sums[:, 0] += s[:, 0]
+                sums[:, 1] += s[:, 0]**2
+                sums[:, 2] += s[:, 2]
+            state[active] = s
+            steps += window
+
+            mean_x = sums[:, 0] / window
+            fp = np.column_stack([mean_x,
+                                  np.sqrt(np.maximum(sums[:, 1] / window - mean_x**2, 0)),
+                                  sums[:, 2] / window])
+
+            done = ~np.isfinite(fp).all(axis=1)
+            labels[active[done]] = DIVERGED
+
+            if steps >= min_transient:
+                match = _match_catalogue(fp, catalogue_fp, tol)
+                found = (match >= 0) & ~done
+                labels[active[found]] = match[found]
+                done |= found
+
+                # Settled on something new: add it to the catalogue
+                settled = ~done & (np.abs(fp - previous_fp[active]) <= tol).all(axis=1)
+                candidates = np.flatnonzero(settled)
+                while candidates.size:
+                    first = candidates[0]
+                    label = len(catalogue)
+                    catalogue_fp.append(fp[first])
+                    catalogue.append({'label': label,
+                                      'fingerprint': tuple(fp[first]),
+                                      'initial_state': tuple(initial[active[first]]),
+                                      'steps': steps})
+                    same = (np.abs(fp[candidates] - fp[first]) <= tol).all(axis=1)
+                    labels[active[candidates[same]]] = label
+                    done[candidates[same]] = True
+                    candidates = candidates[~same]
+
+            previous_fp[active] = fp
+            active = active[~done]
+
+    counts = np.bincount(labels[labels >= 0], minlength=len(catalogue))
+    for entry in catalogue:
+        entry['n_cells'] = int(counts[entry['label']])
+
+    return labels.reshape(X0.shape), catalogue
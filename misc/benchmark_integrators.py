@@ -0,0 +1,71 @@
+import time
+import numpy as np
+from scipy.integrate import odeint
+from config import FHN_PARAMS, LEARNING_PARAMS
+from utils import (fitzhugh_nagumo_ode, coupled_fhn_static, coupled_fhn_plastic,
+                   coupled_fhn_plastic_batch, simulate_ensemble)
+from integrators import odeint_fixed
+
+# Reference setups from notebooks 01, 02 and 04 (dense dt=0.01 grid)
+a, b, tau = FHN_PARAMS['a'], FHN_PARAMS['b'], FHN_PARAMS['tau']
+params_static = {'a': a, 'b': b, 'tau': tau, 'I_ext': 0.5, 'g': 0.3}
+params_plastic = {'a': a, 'b': b, 'tau': tau, 'I_ext': 0.5,
+                  'alpha': LEARNING_PARAMS['alpha'], 'beta': LEARNING_PARAMS['beta']}
+
+cases = [
+    ('NB01 single FHN', fitzhugh_nagumo_ode, [0.1, 0.1],
+     np.arange(0, 100, 0.01), (a, b, tau, FHN_PARAMS['I_ext'])),
+    ('NB02 static g=0.3', coupled_fhn_static, [0.1, 0.1, -0.5, 0.3],
+     np.arange(0, 200, 0.01), (params_static,)),
+    ('NB04 plastic', coupled_fhn_plastic, [0.1, 0.1, -0.5, 0.3, 0.0],
+     np.arange(0, 500, 0.01), (params_plastic,)),
+]
+
+# (method, output stride): a stride > 1 integrates with a coarser step
+# and compares on the common time points
+configs = [('euler', 1), ('heun', 1), ('rk4', 1), ('rk4', 5), ('rk4', 10),
+           ('semi_implicit_euler', 1)]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+print(f"{'case':<20} {'method':<22} {'dt':<6} {'time (s)':<10} {'speed-up':<9} {'max |err|':<10}")
+print("-" * 80)
+
+for name, rhs, y0, t, args in cases:
+    ref, t_ref = timed(lambda: odeint(rhs, y0, t, args=args))
+    print(f"{name:<20} {'odeint (reference)':<22} {'adapt':<6} {t_ref:<10.3f} {'1.0':<9} {'-':<10}")
+
+    for method, stride in configs:
+        t_coarse = t[::stride]
+        sol, t_run = timed(lambda: odeint_fixed(rhs, y0, t_coarse, args=args, method=method))
+        err = np.max(np.abs(sol - ref[::stride]))
+        dt = (t[1] - t[0]) * stride
+        print(f"{'':<20} {method:<22} {dt:<6.2f} {t_run:<10.3f} {t_ref/t_run:<9.1f} {err:<10.2e}")
+    print()
+
+# Ensemble: the 15x15 alpha/beta grid of notebook 05 (final M only)
+alpha_grid, beta_grid = np.meshgrid(np.linspace(0.02, 0.3, 15), np.linspace(0.001, 0.05, 15))
+t = np.arange(0, 300, 0.01)
+y0 = [0.1, 0.1, -0.5, 0.3, 0.0]
+batch_params = dict(params_plastic, alpha=alpha_grid.ravel(), beta=beta_grid.ravel())
+n_runs = alpha_grid.size
+
+ref, t_ref = timed(lambda: np.array(
+    [odeint(coupled_fhn_plastic, y0, t, args=(dict(params_plastic, alpha=al, beta=be),))[-1, 4]
+     for al, be in zip(alpha_grid.ravel(), beta_grid.ravel())]))
+print(f"NB05 alpha/beta grid ({n_runs} runs)")
+print(f"  {n_runs}x odeint:            {t_ref:.3f} s")
+
+sol, t_run = timed(lambda: simulate_ensemble(coupled_fhn_plastic_batch, y0, t, batch_params))
+err = np.max(np.abs(sol[-1, :, 4] - ref))
+print(f"  batched odeint:          {t_run:.3f} s ({t_ref/t_run:.1f}x), max |err M| {err:.2e}")
+
+sol, t_run = timed(lambda: odeint_fixed(coupled_fhn_plastic_batch, np.tile(y0, n_runs), t[::5],
+                                        args=(batch_params,), method='rk4'))
+err = np.max(np.abs(sol[-1].reshape(n_runs, 5)[:, 4] - ref))
+print(f"  batched rk4 (dt=0.05):   {t_run:.3f} s ({t_ref/t_run:.1f}x), max |err M| {err:.2e}")
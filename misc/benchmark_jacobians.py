@@ -0,0 +1,87 @@
+import time
+import numpy as np
+from scipy.integrate import odeint, solve_ivp
+from config import FHN_PARAMS
+from utils import (fitzhugh_nagumo_ode, coupled_fhn_static, coupled_fhn_plastic,
+                   jacobian_kwargs, JACOBIANS)
+from network import FHNNetwork, ring_graph
+
+# Learning-run settings: tau = 12.5 and slow forgetting (beta = 0.001)
+params = dict(FHN_PARAMS, g=0.3, alpha=0.1, beta=0.001)
+t = np.arange(0, 500, 0.01)
+
+
+class CountingRHS:
+    """Wraps a right-hand side and counts its calls"""
+
+    def __init__(self, rhs):
+        self.rhs = rhs
+        self.calls = 0
+
+    def __call__(self, *args):
+        self.calls += 1
+        return self.rhs(*args)
+
+
+cases = [
+    ('fitzhugh_nagumo_ode', fitzhugh_nagumo_ode, [0.1, 0.1],
+     (params['a'], params['b'], params['tau'], params['I_ext'])),
+    ('coupled_fhn_static', coupled_fhn_static, [0.1, 0.1, -0.5, 0.3], (params,)),
+    ('coupled_fhn_plastic', coupled_fhn_plastic, [0.1, 0.1, -0.5, 0.3, 0.0], (params,)),
+]
+
+print("odeint (LSODA): RHS calls without / with the analytic Dfun")
+print(f"{'model':<22} {'RHS (FD)':>9} {'RHS (Dfun)':>11} {'Jacobians':>10} {'stiff steps':>12}")
+for name, rhs, y0, args in cases:
+    counts = []
+    for kwargs in ({}, jacobian_kwargs(rhs)):
+        f = CountingRHS(rhs)
+        _, info = odeint(f, y0, t, args=args, full_output=True, **kwargs)
+        counts.append(f.calls)
+    n_stiff = int(np.sum(info['mused'] == 2))
+    print(f"{name:<22} {counts[0]:>9} {counts[1]:>11} {info['nje'][-1]:>10} {n_stiff:>12}")
+
+print("\nsolve_ivp implicit methods on coupled_fhn_plastic: RHS calls (time)")
+jac = JACOBIANS[coupled_fhn_plastic][0]
+y0 = [0.1, 0.1, -0.5, 0.3, 0.0]
+for method in ('BDF', 'Radau', 'LSODA'):
+    row = []
+    for use_jac in (False, True):
+        f = CountingRHS(coupled_fhn_plastic)
+        kwargs = {'jac': lambda tt, y: jac(y, tt, params)} if use_jac else {}
+        start = time.perf_counter()
+        solve_ivp(lambda tt, y: f(y, tt, params), (0, 500), y0, method=method, **kwargs)
+        row.append(f"{f.calls:>6} ({time.perf_counter() - start:.2f} s)")
+    print(f"  {method:<6} finite differences: {row[0]}   analytic: {row[1]}")
+
+print("\nPlastic ring network (200 neurons, 400 edges), BDF with sparse Jacobian")
+net = FHNNetwork(ring_graph(200, 1))
+rng = np.random.default_rng(0)
+y0 = net.initial_state(rng.uniform(-1, 1, 200), 0.0, 0.0)
+net_params = dict(params, I_ext=0.5)
+for label, kwargs in (('finite differences', {}),
+                      ('sparse analytic', {'jac': lambda tt, y: net.jacobian(y, tt, net_params)})):
+    f = CountingRHS(net.rhs)
+    start = time.perf_counter()
+    solve_ivp(lambda tt, y: f(y, tt, net_params), (0, 50), y0, method='BDF', **kwargs)
+    print(f"  {label:<18}: {f.calls:>7} RHS calls, {time.perf_counter() - start:.2f} s")
+
+print("\nStiff plastic ring network (300 neurons, tau = 0.002), odeint")
+net = FHNNetwork(ring_graph(300, 2))
+y0 = net.initial_state(rng.uniform(-1, 1, 300), 0.0, 0.1)
+stiff_params = dict(params, I_ext=0.5, alpha=50.0, beta=0.01, tau=0.002)
+t_stiff = np.linspace(0, 20, 201)
+perm, ml, mu = net.band_ordering()
+print(f"  band ordering: ml = {ml}, mu = {mu} for {net.state_size} states")
+
+f = CountingRHS(net.rhs)
+start = time.perf_counter()
+ref = odeint(f, y0, t_stiff, args=(stiff_params,), rtol=1e-8, atol=1e-10)
+print(f"  {'finite differences':<18}: {f.calls:>7} RHS calls, {time.perf_counter() - start:.2f} s")
+
+f = CountingRHS(net.rhs)
+net.rhs = f
+start = time.perf_counter()
+sol = net.simulate(y0, t_stiff, stiff_params, method='odeint', rtol=1e-8, atol=1e-10)
+print(f"  {'banded analytic':<18}: {f.calls:>7} RHS calls, {time.perf_counter() - start:.2f} s"
+      f" (max difference {np.abs(sol - ref).max():.1e})")
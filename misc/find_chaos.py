@@ -1,51 +1,9 @@
-
 import numpy as np
-from utils import iterate_memristive_fhn
+from orbits import classify_orbits, orbit_label, OrbitClass, ORBIT_NAMES, CHAOTIC
 from config import FHN_DISCRETE_PARAMS, MEMRISTOR_PARAMS
 
-def check_chaos(i_ext, k1, k2):
-    params = {**FHN_DISCRETE_PARAMS, **MEMRISTOR_PARAMS}
-    params['I_ext'] = i_ext
-    params['k1'] = k1
-    params['k2'] = k2
-    
-    try:
-        # Run simulation
-        trajectory = iterate_memristive_fhn(
-            [0.01, 0.02, 0.1], 
-            params,
-            5000,
-            transient=2000
-        )
-        
-        if trajectory.shape[0] < 100:
-            return False, 0, "Simulation failed"
-            
-        x = trajectory[:, 0]
-        
-        # Check for NaNs/Infs
-        if np.any(np.isnan(x)) or np.any(np.isinf(x)):
-            return False, 0, "Unstable (NaN/Inf)"
-            
-        # Check variance (must be significant)
-        var_x = np.var(x)
-        if var_x < 0.01:
-            return False, var_x, "Low variance (Fixed point)"
-            
-        # Check for periodicity by counting unique points (rounded)
-        # Chaos should have many unique points
-        unique_points = len(np.unique(np.round(x, 4)))
-        
-        if unique_points < 20:
-             return False, var_x, f"Periodic (Period ~{unique_points})"
-             
-        return True, var_x, f"Chaotic? (Unique points: {unique_points})"
-        
-    except Exception as e:
-        return False, 0, f"Error: {e}"
-
 print("Searching for chaotic parameters...")
-print(f"{'I_ext':<10} {'k1':<10} {'k2':<10} {'Status':<30} {'Variance':<10}")
+print(f"{'I_ext':<10} {'k1':<10} {'k2':<10} {'Status':<30} {'Lyapunov':<10}")
 print("-" * 70)
 
 # Coarse sweep
@@ -53,27 +11,32 @@ i_ext_vals = np.arange(0.1, 2.0, 0.1)
 k1_vals = np.arange(-0.2, 0.0, 0.02)
 k2_vals = np.arange(0.1, 0.5, 0.1)
 
+# Whole (I_ext, k1, k2) grid as one batch: period from a return-map
+# check, otherwise the Lyapunov sign
+I_grid, k1_grid, k2_grid = (g.ravel() for g in np.meshgrid(i_ext_vals, k1_vals, k2_vals,
+                                                           indexing='ij'))
+params = {**FHN_DISCRETE_PARAMS, **MEMRISTOR_PARAMS, 'I_ext': I_grid, 'k1': k1_grid, 'k2': k2_grid}
+kind, period, lyapunov = classify_orbits([0.01, 0.02, 0.1], params, transient=2000)
+
 found_params = []
 
-for i_ext in i_ext_vals:
-    for k1 in k1_vals:
-        for k2 in k2_vals:
-            is_chaos, var, msg = check_chaos(i_ext, k1, k2)
-            if is_chaos:
-                print(f"{i_ext:<10.2f} {k1:<10.2f} {k2:<10.2f} {msg:<30} {var:<10.4f}")
-                found_params.append((i_ext, k1, k2, var))
+for n in np.flatnonzero(kind == CHAOTIC):
+    i_ext, k1, k2, lam = I_grid[n], k1_grid[n], k2_grid[n], lyapunov[n]
+    msg = orbit_label(OrbitClass(ORBIT_NAMES[kind[n]], int(period[n]), lam))
+    print(f"{i_ext:<10.2f} {k1:<10.2f} {k2:<10.2f} {msg:<30} {lam:<10.4f}")
+    found_params.append((i_ext, k1, k2, lam))
 
 if found_params:
-    # Sort by variance (higher variance often means larger attractor)
+    # Sort by Lyapunov exponent (most strongly chaotic first)
     found_params.sort(key=lambda x: x[3], reverse=True)
     best = found_params[0]
     result_msg = "\nBest Candidate:\n"
-    result_msg += f"I_ext={best[0]:.2f}, k1={best[1]:.2f}, k2={best[2]:.2f}, Var={best[3]:.4f}\n"
+    result_msg += f"I_ext={best[0]:.2f}, k1={best[1]:.2f}, k2={best[2]:.2f}, lambda={best[3]:.4f}\n"
     print(result_msg)
     with open('chaos_results.txt', 'w') as f:
         f.write(result_msg)
         for p in found_params:
-             f.write(f"I_ext={p[0]:.2f}, k1={p[1]:.2f}, k2={p[2]:.2f}, Var={p[3]:.4f}\n")
+             f.write(f"I_ext={p[0]:.2f}, k1={p[1]:.2f}, k2={p[2]:.2f}, lambda={p[3]:.4f}\n")
 
 else:
     print("\nNo chaotic parameters found.")
@@ -0,0 +1,27 @@
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+from map_analysis import lyapunov_heatmap
+
+# (theta, k1) plane of Figure 6 in Shatnawi et al. (2023)
+base_params = {'gamma': -0.2, 'delta': 0.08, 'I_ext': 2.0, 'k2': 0.2}
+theta_vals = np.linspace(-0.1, 0.2, 200)
+k1_vals = np.linspace(-0.2, 0.2, 200)
+
+print(f"Computing largest Lyapunov exponent on a {len(theta_vals)}x{len(k1_vals)} grid...")
+start = time.perf_counter()
+lam = lyapunov_heatmap(base_params, 'theta', theta_vals, 'k1', k1_vals,
+                       initial_state=[0.01, 0.02, 0.1], n_steps=2000, transient=1000)
+print(f"Done in {time.perf_counter() - start:.1f} s")
+print(f"  chaotic (λ>0): {np.mean(lam > 0):.1%}, diverged: {np.mean(np.isnan(lam)):.1%}")
+
+fig, ax = plt.subplots(figsize=(10, 8))
+vmax = np.nanmax(np.abs(lam))
+im = ax.imshow(lam, extent=[theta_vals[0], theta_vals[-1], k1_vals[0], k1_vals[-1]],
+               origin='lower', aspect='auto', cmap='RdBu_r', vmin=-vmax, vmax=vmax)
+fig.colorbar(im, ax=ax, label='Largest Lyapunov exponent')
+ax.set_xlabel('θ')
+ax.set_ylabel('$k_1$')
+ax.set_title('Lyapunov map (white = diverged)')
+plt.savefig('lyapunov_map.png', dpi=100)
+print("✓ Saved lyapunov_map.png")
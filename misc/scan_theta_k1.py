@@ -0,0 +1,49 @@
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.colors import ListedColormap
+from sweep import scan_parameter_plane, print_progress
+from orbits import ORBIT_NAMES
+
+# Dense (theta, k1) plane like Figure 6 of Shatnawi et al. (2023)
+base_params = {'gamma': -0.2, 'delta': 0.08, 'I_ext': 2.0, 'k2': 0.2}
+theta_vals = np.linspace(-0.1, 0.2, 1000)
+k1_vals = np.linspace(-0.2, 0.2, 1000)
+
+if __name__ == "__main__":
+    # Rerunning after an interruption resumes from the unfinished tiles
+    print(f"Scanning a {len(k1_vals)}x{len(theta_vals)} (k1, theta) grid...")
+    start = time.perf_counter()
+    scan = scan_parameter_plane(base_params, 'theta', theta_vals, 'k1', k1_vals,
+                                'theta_k1_scan', progress=print_progress,
+                                transient=1000, n_lyapunov=1000)
+    print(f"Done in {time.perf_counter() - start:.1f} s")
+
+    kind = np.asarray(scan['kind'])
+    for code, name in ORBIT_NAMES.items():
+        print(f"  {name:<15} {np.mean(kind == code):.1%}")
+
+    codes = sorted(ORBIT_NAMES)
+    cmap = ListedColormap(['white', 'tab:blue', 'tab:green', 'tab:orange', 'tab:red'])
+    extent = [theta_vals[0], theta_vals[-1], k1_vals[0], k1_vals[-1]]
+
+    fig, axes = plt.subplots(1, 2, figsize=(16, 7))
+    im = axes[0].imshow(np.searchsorted(codes, kind), extent=extent, origin='lower',
+                        aspect='auto', cmap=cmap, vmin=-0.5, vmax=len(codes) - 0.5)
+    cbar = fig.colorbar(im, ax=axes[0], ticks=range(len(codes)))
+    cbar.ax.set_yticklabels([ORBIT_NAMES[c] for c in codes])
+    axes[0].set_title('Orbit type')
+
+    lam = np.asarray(scan['lyapunov'])
+    vmax = np.nanmax(np.abs(lam))
+    im = axes[1].imshow(lam, extent=extent, origin='lower', aspect='auto',
+                        cmap='RdBu_r', vmin=-vmax, vmax=vmax)
+    fig.colorbar(im, ax=axes[1], label='Largest Lyapunov exponent')
+    axes[1].set_title('Lyapunov exponent (white = diverged or short period)')
+
+    for ax in axes:
+        ax.set_xlabel('θ')
+        ax.set_ylabel('$k_1$')
+    plt.tight_layout()
+    plt.savefig('theta_k1_scan.png', dpi=100)
+    print("✓ Saved theta_k1_scan.png")
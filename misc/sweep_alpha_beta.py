@@ -0,0 +1,42 @@
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+from config import FHN_PARAMS
+from utils import coupled_fhn_plastic
+from sweep import parameter_grid, run_sweep, OdeRun, final_state, print_progress
+
+# Same grid as the alpha/beta heatmap in notebook 05
+alpha_range = np.linspace(0.02, 0.3, 15)
+beta_range = np.linspace(0.001, 0.05, 15)
+
+dt = 0.01
+t_short = np.arange(0, 300, dt)
+initial_state = [0.1, 0.1, -0.5, 0.3, 0.0]
+
+params_sweep = FHN_PARAMS.copy()
+params_sweep['I_ext'] = 0.5
+
+if __name__ == "__main__":
+    # Rows = beta, columns = alpha (matches M_matrix in the notebook)
+    grid, shape = parameter_grid(params_sweep, beta=beta_range, alpha=alpha_range)
+    task = OdeRun(coupled_fhn_plastic, initial_state, t_short)
+
+    print(f"Exploring parameter space: {len(grid)} simulations...")
+    start = time.perf_counter()
+    finals = run_sweep(task, grid, reduce=final_state, progress=print_progress)
+    print(f"Sweep finished in {time.perf_counter() - start:.1f} s")
+
+    M_matrix = np.array(finals)[:, 4].reshape(shape)
+
+    fig, ax = plt.subplots(figsize=(10, 8))
+    im = ax.imshow(M_matrix, extent=[alpha_range[0], alpha_range[-1],
+                                     beta_range[0], beta_range[-1]],
+                   aspect='auto', origin='lower', cmap='RdYlGn', vmin=0, vmax=1)
+    ax.contour(alpha_range, beta_range, M_matrix, levels=[0.8],
+               colors='blue', linewidths=2.5)
+    ax.set_xlabel('Learning Rate (α)')
+    ax.set_ylabel('Forgetting Rate (β)')
+    ax.set_title('Final Synaptic Weight M')
+    fig.colorbar(im, ax=ax, label='Final M')
+    plt.savefig('alpha_beta_heatmap.png', dpi=100)
+    print("✓ Heatmap saved to alpha_beta_heatmap.png")
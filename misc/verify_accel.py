@@ -0,0 +1,57 @@
+import time
+import numpy as np
+from accel import (HAVE_NUMBA, iterate_memristive_fhn_fast,
+                   simulate_memristor_hysteresis)
+from config import MEMRISTOR_PARAMS
+
+# Atlas cases from notebook 03 (Figure 7 of the paper)
+cases = [(0.008, -0.05), (0.066, -0.05), (0.117, -0.05),
+         (0.039, -0.14), (0.045, 0.02), (-0.026, 0.02)]
+
+if not HAVE_NUMBA:
+    print("numba is not installed - only the numpy backend is available")
+    raise SystemExit(0)
+
+print("Comparing numba and numpy backends...")
+print(f"{'theta':<10} {'k1':<10} {'identical':<10} {'numpy (s)':<12} {'numba (s)':<12}")
+print("-" * 56)
+
+# Warm up the JIT so compile time is not counted
+iterate_memristive_fhn_fast([0.01, 0.02, 0.1], {'gamma': -0.2, 'theta': 0.008, 'delta': 0.08,
+                            'I_ext': 2.0, 'k1': -0.05, 'k2': 0.2}, 10, backend='numba')
+
+all_ok = True
+for theta, k1 in cases:
+    params = {'gamma': -0.2, 'theta': theta, 'delta': 0.08,
+              'I_ext': 2.0, 'k1': k1, 'k2': 0.2}
+
+    start = time.perf_counter()
+    ref = iterate_memristive_fhn_fast([0.01, 0.02, 0.1], params, 25000, 8000, backend='numpy')
+    t_ref = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fast = iterate_memristive_fhn_fast([0.01, 0.02, 0.1], params, 25000, 8000, backend='numba')
+    t_fast = time.perf_counter() - start
+
+    same = np.array_equal(ref, fast, equal_nan=True)
+    all_ok &= same
+    print(f"{theta:<10.3f} {k1:<10.2f} {str(same):<10} {t_ref:<12.4f} {t_fast:<12.4f}")
+
+# Hysteresis loop at the lowest frequency used in notebook 03
+a, b, h = MEMRISTOR_PARAMS['a'], MEMRISTOR_PARAMS['b'], MEMRISTOR_PARAMS['h']
+simulate_memristor_hysteresis(2.0, 0.05, 0.1, a, b, h, n_cycles=1, backend='numba')
+
+start = time.perf_counter()
+ref = simulate_memristor_hysteresis(2.0, 0.05, 3*np.pi, a, b, h, n_cycles=3, backend='numpy')
+t_ref = time.perf_counter() - start
+
+start = time.perf_counter()
+fast = simulate_memristor_hysteresis(2.0, 0.05, 3*np.pi, a, b, h, n_cycles=3, backend='numba')
+t_fast = time.perf_counter() - start
+
+same = all(np.array_equal(r, f) for r, f in zip(ref, fast))
+all_ok &= same
+print(f"\nHysteresis ({len(ref[0])} steps): identical={same}, "
+      f"numpy {t_ref:.4f} s, numba {t_fast:.4f} s")
+
+print("\nALL BACKENDS AGREE" if all_ok else "\nMISMATCH BETWEEN BACKENDS")
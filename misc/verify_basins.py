@@ -0,0 +1,54 @@
+import time
+import numpy as np
+from accel import iterate_memristive_fhn_fast
+from map_analysis import basin_map, DIVERGED, UNRESOLVED
+
+# Atlas cases from notebook 03 (Figure 7 of the paper)
+cases = [(0.008, -0.05), (0.066, -0.05), (0.117, -0.05),
+         (0.039, -0.14), (0.045, 0.02), (-0.026, 0.02)]
+
+x0_values = np.linspace(-2, 2, 40)
+z0_values = np.linspace(-20, 20, 150)
+window, tol = 500, np.array([0.15, 0.15, 0.5])
+n_check, n_long = 300, 5000
+rng = np.random.default_rng(0)
+
+
+def long_run_label(initial_state, params, catalogue):
+    """Label of one initial condition from its own long run"""
+    with np.errstate(invalid='ignore', over='ignore'):
+        traj = iterate_memristive_fhn_fast(initial_state, params, n_long + window, n_long)
+    if not np.all(np.isfinite(traj)):
+        return DIVERGED
+    fp = np.array([traj[:, 0].mean(), traj[:, 0].std(), traj[:, 2].mean()])
+    for entry in catalogue:
+        if np.all(np.abs(fp - entry['fingerprint']) <= tol):
+            return entry['label']
+    return UNRESOLVED
+
+
+print("Comparing basin_map labels with long single-trajectory runs...")
+print(f"{'theta':<8} {'k1':<7} {'attractors':>10} {'diverged':>9} {'unresolved':>11} "
+      f"{'time (s)':>9} {'checked':>8} {'agree':>6}")
+print("-" * 76)
+
+all_ok = True
+for theta, k1 in cases:
+    params = {'gamma': -0.2, 'theta': theta, 'delta': 0.08,
+              'I_ext': 2.0, 'k1': k1, 'k2': 0.2}
+
+    start = time.perf_counter()
+    labels, catalogue = basin_map(params, x0_values, z0_values, window=window, tol=tol)
+    t_map = time.perf_counter() - start
+
+    # Random cells, each iterated on its own well past the batch transient
+    rows = rng.integers(0, len(x0_values), n_check)
+    cols = rng.integers(0, len(z0_values), n_check)
+    agree = sum(long_run_label([x0_values[r], 0.02, z0_values[c]], params, catalogue)
+                == labels[r, c] for r, c in zip(rows, cols))
+
+    all_ok &= agree == n_check
+    print(f"{theta:<8.3f} {k1:<7.2f} {len(catalogue):>10} {int(np.sum(labels == DIVERGED)):>9} "
+          f"{int(np.sum(labels == UNRESOLVED)):>11} {t_map:>9.2f} {n_check:>8} {agree:>6}")
+
+print("\nALL BASIN LABELS AGREE" if all_ok else "\nMISMATCH IN BASIN LABELS")
@@ -0,0 +1,107 @@
+import time
+import tracemalloc
+import numpy as np
+from network import MapLattice, ring_graph, small_world_graph
+from utils import memristive_fhn_map
+
+params = {'gamma': -0.2, 'theta': 0.3, 'delta': 0.08, 'I_ext': 2.0,
+          'k1': -0.05, 'k2': 0.2, 'eps': 0.02, 'eps_m': 0.005}
+rng = np.random.default_rng(0)
+
+
+def grid_neighbours(shape, periodic):
+    """Neighbour lists of a 1D chain or 2D grid (None marks a fixed boundary site)"""
+    rows, cols = (1, shape[0]) if len(shape) == 1 else shape
+    neighbours = []
+    for r in range(rows):
+        for c in range(cols):
+            offsets = [(0, -1), (0, 1)] + ([(-1, 0), (1, 0)] if len(shape) == 2 else [])
+            site = []
+            for dr, dc in offsets:
+                rr, cc = r + dr, c + dc
+                if periodic:
+                    site.append((rr % rows) * cols + cc % cols)
+                elif 0 <= rr < rows and 0 <= cc < cols:
+                    site.append(rr * cols + cc)
+                else:
+                    site.append(None)
+            neighbours.append(site)
+    return neighbours
+
+
+def naive_step(state, neighbours, boundary_value=0.0):
+    """One lattice step, site by site, from memristive_fhn_map"""
+    out = np.empty_like(state)
+    for i, site in enumerate(neighbours):
+        x, _, z = state[i]
+        coupling = sum((boundary_value if j is None else state[j, 0]) - x for j in site)
+        out[i] = memristive_fhn_map(state[i], params)
+        out[i, 0] += (params['eps'] + params['eps_m'] * z) * coupling
+    return out
+
+
+def graph_neighbours(A):
+    return [list(A.indices[A.indptr[i]:A.indptr[i + 1]]) for i in range(A.shape[0])]
+
+
+cases = [('chain 50, periodic', (50,), 'periodic'), ('chain 50, fixed', (50,), 'fixed'),
+         ('grid 7x9, periodic', (7, 9), 'periodic'), ('grid 7x9, fixed', (7, 9), 'fixed')]
+
+print("Comparing MapLattice with a site-by-site loop...")
+print(f"{'lattice':<24} {'1 step':>10} {'20 steps':>10}")
+print("-" * 46)
+
+all_ok = True
+for name, shape, boundary in cases:
+    lattice = MapLattice(shape, boundary=boundary, boundary_value=0.3)
+    neighbours = grid_neighbours(shape, boundary == 'periodic')
+    state = rng.uniform(-1, 1, (lattice.n_sites, 3))
+
+    out = np.empty_like(state)
+    lattice.step(state, params, out)
+    err_step = np.max(np.abs(out - naive_step(state, neighbours, 0.3)))
+
+    start = np.array([0.01, 0.02, 0.1]) + rng.normal(0, 0.05, (lattice.n_sites, 3))
+    final, _ = lattice.iterate(start, params, 20)
+    ref = start
+    for _ in range(20):
+        ref = naive_step(ref, neighbours, 0.3)
+    err_run = np.max(np.abs(final - ref))
+
+    # Rounding differences grow along the (chaotic) run
+    all_ok &= err_step < 1e-14 and err_run < 1e-10
+    print(f"{name:<24} {err_step:>10.1e} {err_run:>10.1e}")
+
+# Sparse adjacency: arbitrary graph, and a ring against the periodic chain
+A = small_world_graph(60, 2, 0.3, seed=1)
+lattice = MapLattice(A)
+state = rng.uniform(-1, 1, (60, 3))
+out = np.empty_like(state)
+lattice.step(state, params, out)
+err = np.max(np.abs(out - naive_step(state, graph_neighbours(A))))
+all_ok &= err < 1e-14
+print(f"{'small-world graph 60':<24} {err:>10.1e}")
+
+start = np.array([0.01, 0.02, 0.1]) + rng.normal(0, 0.01, (50, 3))
+ring, _ = MapLattice(ring_graph(50, 1)).iterate(start, params, 30)
+chain, _ = MapLattice(50).iterate(start, params, 30)
+err = np.max(np.abs(ring - chain))
+all_ok &= err < 1e-12
+print(f"\nRing graph vs periodic chain, 30 steps: max |diff| {err:.1e}")
+
+# 1000 x 1000 grid: time per step and memory allocated by step()
+lattice = MapLattice((1000, 1000))
+state = np.array([0.01, 0.02, 0.1]) + rng.normal(0, 0.01, (lattice.n_sites, 3))
+out = np.empty_like(state)
+lattice.step(state, params, out)
+tracemalloc.start()
+start = time.perf_counter()
+for _ in range(10):
+    lattice.step(state, params, out)
+elapsed = (time.perf_counter() - start) / 10
+peak = tracemalloc.get_traced_memory()[1]
+tracemalloc.stop()
+print(f"1000 x 1000 grid: {1e3 * elapsed:.0f} ms per step, "
+      f"{peak / 1e6:.2f} MB allocated at peak")
+
+print("\nALL LATTICE UPDATES AGREE" if all_ok else "\nMISMATCH IN LATTICE UPDATE")
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import numpy as np
+from sweep import scan_parameter_plane, _scan_meta, _open_scan
+
+base_params = {'gamma': -0.2, 'delta': 0.08, 'I_ext': 2.0, 'k2': 0.2}
+theta_vals = np.linspace(-0.1, 0.2, 12)
+k1_vals = np.linspace(-0.2, 0.2, 10)
+# NumPy scalars, as they come out of a config array or a loop over np.arange
+kwargs = {'transient': np.int64(300), 'n_lyapunov': np.int64(300), 'lyap_tol': np.float64(5e-3)}
+
+print("Checking that scan_parameter_plane resumes from scan.json...")
+all_ok = True
+with tempfile.TemporaryDirectory() as tmp:
+    out_dir = os.path.join(tmp, 'scan')
+    calls = []
+    first = scan_parameter_plane(base_params, 'theta', theta_vals, 'k1', k1_vals, out_dir,
+                                 tile_shape=(4, 5), n_workers=1,
+                                 progress=lambda n, total: calls.append(n), **kwargs)
+    first = {name: np.array(value) for name, value in first.items()}
+    print(f"  first run: {len(calls)} tiles classified")
+
+    # Same call again: every tile is marked done, nothing is recomputed
+    calls = []
+    second = scan_parameter_plane(base_params, 'theta', theta_vals, 'k1', k1_vals, out_dir,
+                                  tile_shape=(4, 5), n_workers=1,
+                                  progress=lambda n, total: calls.append(n), **kwargs)
+    same = all(np.array_equal(first[name], second[name], equal_nan=True) for name in first)
+    all_ok &= not calls and same
+    print(f"  resumed run: {len(calls)} tiles classified, results identical={same}")
+
+    # Tuples and NumPy arrays in the settings come back from JSON as lists
+    meta = _scan_meta(base_params, 'theta', theta_vals, 'k1', k1_vals, np.array([0.01, 0.02, 0.1]),
+                      (4, 5), {'block': np.int32(50), 'window': (64,)})
+    meta_dir = os.path.join(tmp, 'meta')
+    _open_scan(meta_dir, meta, (10, 12), (3, 3))
+    meta = _scan_meta(base_params, 'theta', theta_vals, 'k1', k1_vals, (0.01, 0.02, 0.1),
+                      (4, 5), {'block': 50, 'window': (64,)})
+    _open_scan(meta_dir, meta, (10, 12), (3, 3))
+    print("  tuple and NumPy settings reopen: True")
+
+    # A different scan in the same directory is still refused
+    try:
+        scan_parameter_plane(base_params, 'theta', theta_vals, 'k1', k1_vals, out_dir,
+                             tile_shape=(4, 5), n_workers=1, transient=400)
+        refused = False
+    except ValueError:
+        refused = True
+    all_ok &= refused
+    print(f"  different settings refused: {refused}")
+
+print("\nALL SCAN RESUMES AGREE" if all_ok else "\nMISMATCH IN SCAN RESUME")
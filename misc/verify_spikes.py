@@ -0,0 +1,126 @@
+import time
+import numpy as np
+from scipy.integrate import odeint
+from config import FHN_PARAMS
+from utils import coupled_fhn_static
+from spikes import (SpikeTrains, isi_statistics, van_rossum_distance, spike_synchronization,
+                    spike_sync_matrix, spike_time_tiling)
+
+rng = np.random.default_rng(1)
+
+# Random trains on [0, 100], plus an empty train, a lone spike and a
+# train with a repeated spike time
+lists = [np.sort(rng.uniform(0, 100, rng.integers(0, 40))) for _ in range(6)]
+lists += [np.array([]), np.array([50.0]), np.array([20.0, 20.0, 70.0])]
+trains = SpikeTrains.from_lists(lists, 0.0, 100.0)
+n = len(lists)
+counts = trains.counts
+
+
+def half_interval(train, i):
+    left = train[i] - train[i - 1] if i > 0 else np.inf
+    right = train[i + 1] - train[i] if i < len(train) - 1 else np.inf
+    return 0.5 * min(left, right)
+
+
+def coincident(train_a, i, train_b):
+    """Any spike of train_b within the adaptive window of spike i of train_a"""
+    return any(abs(train_a[i] - s) < min(half_interval(train_a, i), half_interval(train_b, j))
+               for j, s in enumerate(train_b))
+
+
+results = []
+
+# ISI statistics, interval by interval
+stats = isi_statistics(trains)
+ref = np.full((3, n), np.nan)
+for i, train in enumerate(lists):
+    isi = np.diff(train)
+    if len(isi) >= 1:
+        ref[0, i] = isi.mean()
+        ref[1, i] = isi.std() / isi.mean()
+    if len(isi) >= 2:
+        ref[2, i] = 3 * np.mean(((isi[:-1] - isi[1:]) / (isi[:-1] + isi[1:]))**2)
+results.append(('isi_statistics', 'per-interval loop', ref, np.array(stats), 1e-12))
+
+# van Rossum: closed form against the filtered traces on a fine grid
+tau, dt_grid = 2.0, 0.001
+grid = np.arange(0, 200, dt_grid)
+filtered = [sum((np.where(grid >= s, np.exp(-(grid - s) / tau), 0.0) for s in train),
+                np.zeros_like(grid)) for train in lists]
+ref = np.array([[np.sqrt(np.sum((fa - fb)**2) * dt_grid / tau) for fb in filtered]
+                for fa in filtered])
+results.append(('van_rossum_distance', 'filtered integral', ref,
+                van_rossum_distance(trains, tau), 5e-4))
+
+# ... and against the kernel double sum over all spike pairs
+K = np.array([[np.exp(-np.abs(a[:, None] - b[None, :]) / tau).sum() for b in lists]
+              for a in lists])
+ref = np.sqrt(np.maximum(0.5 * (np.diag(K)[:, None] + np.diag(K)[None, :] - 2 * K), 0.0))
+results.append(('van_rossum_distance', 'pair double sum', ref,
+                van_rossum_distance(trains, tau), 1e-12))
+
+# SPIKE-synchronization: every spike against every spike of every other train
+pair_counts = np.zeros((n, n))
+per_spike = []
+for a, train_a in enumerate(lists):
+    for i in range(len(train_a)):
+        hits = [coincident(train_a, i, lists[b]) for b in range(n) if b != a]
+        per_spike.append(np.mean(hits))
+        for b in range(n):
+            if b != a:
+                pair_counts[a, b] += coincident(train_a, i, lists[b])
+results.append(('spike_synchronization', 'all spike pairs', np.array(np.mean(per_spike)),
+                np.array(spike_synchronization(trains)), 0.0))
+with np.errstate(invalid='ignore'):
+    ref = (pair_counts + pair_counts.T) / (counts[:, None] + counts[None, :])
+np.fill_diagonal(ref, 1.0)
+results.append(('spike_sync_matrix', 'all spike pairs', ref, spike_sync_matrix(trains), 0.0))
+
+# STTC: P from all spike pairs, T from a fine grid
+dt = 1.0
+fine = np.arange(0, 100, 0.0005)
+tiled = [np.mean(np.any(np.abs(fine[:, None] - train[None, :]) <= dt, axis=1))
+         if len(train) else 0.0 for train in lists]
+ref = np.full((n, n), np.nan)
+for a in range(n):
+    for b in range(n):
+        if counts[a] and counts[b]:
+            pa = np.mean([np.any(np.abs(lists[b] - s) <= dt) for s in lists[a]])
+            pb = np.mean([np.any(np.abs(lists[a] - s) <= dt) for s in lists[b]])
+            ta, tb = tiled[a], tiled[b]
+            ref[a, b] = 0.5 * ((pa - tb) / (1 - pa * tb) + (pb - ta) / (1 - pb * ta))
+results.append(('spike_time_tiling', 'spike pairs + grid', ref, spike_time_tiling(trains, dt), 2e-5))
+
+print("Comparing spike measures with brute-force references...")
+print(f"{'measure':<22} {'reference':<20} {'same NaN':>9} {'max |diff|':>11} {'tolerance':>10}")
+print("-" * 76)
+all_ok = True
+for name, label, ref, value, tol in results:
+    same_nan = np.array_equal(np.isnan(ref), np.isnan(value))
+    err = np.nanmax(np.abs(ref - value)) if same_nan else np.inf
+    ok = same_nan and err <= tol
+    all_ok &= ok
+    print(f"{name:<22} {label:<20} {str(same_nan):>9} {err:>11.1e} {tol:>10.0e}")
+
+# Many trains: run time of the CSR measures
+big = SpikeTrains.from_lists([np.sort(rng.uniform(0, 3000, rng.integers(200, 400)))
+                              for _ in range(500)], 0.0, 3000.0)
+print(f"\n{len(big)} trains, {big.n_spikes} spikes:")
+for name, measure in (('van_rossum_distance', lambda: van_rossum_distance(big, 2.0)),
+                      ('spike_sync_matrix', lambda: spike_sync_matrix(big)),
+                      ('spike_time_tiling', lambda: spike_time_tiling(big, 0.5))):
+    start = time.perf_counter()
+    measure()
+    print(f"  {name:<22} {time.perf_counter() - start:.2f} s")
+
+# Storage: 300 s teacher/student run at dt = 0.01
+t = np.arange(0, 300, 0.01)
+params = dict(FHN_PARAMS, I_ext=0.5, g=0.3)
+sol = odeint(coupled_fhn_static, [0.1, 0.1, -0.5, 0.3], t, args=(params,))
+V = sol[:, [0, 2]].T
+run = SpikeTrains.from_voltage(V, t, threshold=1.0)
+print(f"\nTeacher/student run: {run.n_spikes} spikes in {run.nbytes} bytes, "
+      f"voltage traces {V.nbytes / 1e3:.0f} kB")
+
+print("\nALL SPIKE MEASURES AGREE" if all_ok else "\nMISMATCH IN SPIKE MEASURES")
@@ -0,0 +1,611 @@
+"""
+Networks of FHN neurons with sparse, plastic coupling, and coupled
+lattices of discrete memristive FHN maps
+Graphs are CSR adjacency matrices (row = postsynaptic neuron, column =
+presynaptic neuron), so the cost of a step scales with the edge count
+"""
+
+import numpy as np
+from scipy import sparse
+from scipy.integrate import odeint, solve_ivp
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+from integrators import odeint_fixed
+from utils import n_recorded_steps
+
+
+# ============================================================================
+# GRAPH GENERATORS
+# ============================================================================
+# All generators return an (n, n) CSR matrix A with A[i, j] = 1 for an
+# edge j -> i and no self-loops. Undirected graphs are symmetric.
+
+def _edges_to_csr(n, post, pre, directed):
+    if not directed:
+        post, pre = np.concatenate([post, pre]), np.concatenate([pre, post])
+    keep = post != pre
+    A = sparse.csr_matrix((np.ones(keep.sum()), (post[keep], pre[keep])), shape=(n, n))
+    # Duplicate edges were summed; every edge gets weight 1
+    A.data[:] = 1.0
+    A.sort_indices()
+    return A
+
+
+def ring_graph(n, k=1, directed=False):
+    """
+    Ring lattice: each neuron is connected to its k nearest neighbours on
+    each side
+
+    Parameters:
+    -----------
+    n : int
+        Number of neurons
+    k : int
+        Neighbours on each side
+    directed : bool
+        If True, only edges i -> i+1, ..., i+k (one-way ring)
+
+    Returns:
+    --------
+    A : scipy.sparse.csr_matrix, shape (n, n)
+    """
+    i = np.repeat(np.arange(n), k)
+    offsets = np.tile(np.arange(1, k + 1), n)
+    return _edges_to_csr(n, (i + offsets) % n, i, directed)
+
+
+def small_world_graph(n, k=2, p=0.1, seed=None):
+    """
+    Watts-Strogatz small-world graph (undirected)
+
+    Starts from ring_graph(n, k) and rewires the far end of each edge to
+    a uniformly random neuron with probability p. Targets that would
+    make a self-loop or repeat an existing edge are drawn again, so the
+    graph keeps its n * k edges (an edge whose neuron is already linked
+    to all others stays in place).
+
+    Parameters:
+    -----------
+    n : int
+        Number of neurons
+    k : int
+        Neighbours on each side in the initial ring
+    p : float
+        Rewiring probability (0 = ring, 1 = random graph)
+    seed : int, optional
+        Random seed
+
+    Returns:
+    --------
+    A : scipy.sparse.csr_matrix, shape (n, n)
+    """
+    rng = np.random.default_rng(seed)
+    i = np.repeat(np.arange(n), k)
+    j = (i + np.tile(np.arange(1, k + 1), n)) % n
+    ring_j = j.copy()
+    pending = np.flatnonzero(rng.random(len(j)) < p)
+    settled = np.ones(len(j), dtype=bool)
+    settled[pending] = False
+
+    def edge_key(a, b):
+        return np.minimum(a, b) * n + np.maximum(a, b)
+
+    while pending.size:
+        # Edges still waiting keep their ring edge reserved, so one that
+        # finds every other neuron taken can always fall back to it
+        taken = np.sort(np.concatenate([edge_key(i[settled], j[settled]),
+                                        edge_key(i[pending], ring_j[pending])]))
+        degree = np.bincount(np.concatenate([i[settled], j[settled],
+                                             i[pending], ring_j[pending]]), minlength=n)
+        stuck = degree[i[pending]] >= n - 1
+        j[pending[stuck]] = ring_j[pending[stuck]]
+        settled[pending[stuck]] = True
+        pending = pending[~stuck]
+
+        # A new target must not be a self-loop, a taken edge or the
+        # target of an earlier edge in this round
+        j[pending] = rng.integers(0, n, pending.size)
+        key = edge_key(i[pending], j[pending])
+        _, first = np.unique(key, return_index=True)
+        ok = np.zeros(pending.size, dtype=bool)
+        ok[first] = True
+        known = taken[np.minimum(np.searchsorted(taken, key), len(taken) - 1)] == key
+        ok &= (i[pending] != j[pending]) & ~known
+        settled[pending[ok]] = True
+        pending = pending[~ok]
+
+    return _edges_to_csr(n, j[settled], i[settled], directed=False)
+
+
+def erdos_renyi_graph(n, p, directed=True, seed=None):
+    """
+    Erdos-Renyi random graph G(n, p)
+
+    Edges are drawn as random index pairs (O(edges) work and memory, not
+    O(n^2)); the rare duplicates are merged, so the edge count is very
+    slightly below its expectation for dense graphs.
+
+    Parameters:
+    -----------
+    n : int
+        Number of neurons
+    p : float
+        Connection probability per ordered (or unordered) pair
+    directed : bool
+        Directed or undirected (symmetric) graph
+    seed : int, optional
+        Random seed
+
+    Returns:
+    --------
+    A : scipy.sparse.csr_matrix, shape (n, n)
+    """
+    rng = np.random.default_rng(seed)
+    n_pairs = n * (n - 1) if directed else n * (n - 1) // 2
+    m = rng.binomial(n_pairs, p)
+    post = rng.integers(0, n, m)
+    pre = rng.integers(0, n - 1, m)
+    # Skip the diagonal: pre in [0, n-1) maps to every column except post
+    pre[pre >= post] += 1
+    return _edges_to_csr(n, post, pre, directed)
+
+
+# ============================================================================
+# PLASTIC FHN NETWORK
+# ============================================================================
+
+# Placeholder parameters for building the Jacobian's sparsity pattern
+# (only the positions of the entries are used, not their values)
+_PATTERN_PARAMS = {'b': 1.0, 'tau': 1.0, 'g': 1.0, 'alpha': 1.0, 'beta': 1.0}
+
+
+class FHNNetwork:
+    """
+    N FitzHugh-Nagumo neurons coupled through the edges of a sparse graph
+
+    Neuron i receives I_syn_i = sum_j M_ij (v_j - v_i) over its incoming
+    edges j -> i, the network version of g*(v1 - v2). With plastic=True
+    every edge carries its own weight following the rule of
+    coupled_fhn_plastic,
+
+        dM_ij/dt = alpha (v_j - v_i)^2 (1 - M_ij) - beta M_ij,
+
+    otherwise all weights are fixed at params['g']. The state vector is
+    [v (N), w (N), M (E)] (no M for static coupling), so rhs works with
+    odeint and integrators.odeint_fixed.
+
+    Parameters:
+    -----------
+    adjacency : sparse matrix, shape (N, N)
+        A[i, j] != 0 for an edge j -> i (e.g. from ring_graph)
+    plastic : bool
+        Per-edge plastic weights (True) or static coupling g (False)
+    """
+
+    def __init__(self, adjacency, plastic=True):
+        A = sparse.csr_matrix(adjacency, dtype=float)
+        A.setdiag(0)
+        A.eliminate_zeros()
+        A.sort_indices()
+
+        self.n_neurons = A.shape[0]
+        self.n_edges = A.nnz
+        self.plastic = plastic
+        # Edge e runs pre[e] -> post[e], in CSR order
+        self.pre = A.indices.copy()
+        self.post = np.repeat(np.arange(self.n_neurons), np.diff(A.indptr))
+        # Weight matrix sharing the CSR structure; its data is overwritten
+        # with the current weights on every call
+        self._W = A
+        self._ones = np.ones(self.n_neurons)
+        # (perm, ml, mu) of band_ordering, computed on first use
+        self._band = None
+
+    @property
+    def state_size(self):
+        return 2 * self.n_neurons + (self.n_edges if self.plastic else 0)
+
+    def split_state(self, state):
+        """
+        Views of v, w and M in a state vector (or a solution array)
+
+        Parameters:
+        -----------
+        state : array, shape (..., state_size)
+
+        Returns:
+        --------
+        v, w : arrays, shape (..., N)
+        M : array, shape (..., E), or None for static coupling
+        """
+        N = self.n_neurons
+        v = state[..., :N]
+        w = state[..., N:2*N]
+        M = state[..., 2*N:] if self.plastic else None
+        return v, w, M
+
+    def initial_state(self, v0, w0, M0=0.0):
+        """
+        Assemble a state vector; each part may be a scalar or an array
+
+        Returns:
+        --------
+        state : array, shape (state_size,)
+        """
+        parts = [np.broadcast_to(v0, self.n_neurons), np.broadcast_to(w0, self.n_neurons)]
+        if self.plastic:
+            parts.append(np.broadcast_to(M0, self.n_edges))
+        return np.concatenate(parts).astype(float)
+
+    def rhs(self, state, t, params):
+        """
+        Right-hand side of the network ODE
+
+        Parameters:
+        -----------
+        state : array, shape (state_size,)
+            [v, w, M]
+        t : float
+            Time
+        params : dict
+            'a', 'b', 'tau', 'I_ext' (scalar or per-neuron array of shape
+            (N,)), plus 'alpha', 'beta' (plastic) or 'g' (static)
+
+        Returns:
+        --------
+        derivatives : array, shape (state_size,)
+        """
+        v, w, M = self.split_state(np.asarray(state))
+        a, b, tau = params['a'], params['b'], params['tau']
+
+        W = self._W
+        W.data[:] = M if self.plastic else params['g']
+        # sum_j M_ij (v_j - v_i) = (W v)_i - (W 1)_i v_i
+        I_syn = W @ v - (W @ self._ones) * v
+
+        d = np.empty(self.state_size)
+        dv, dw, dM = self.split_state(d)
+        dv[:] = v - (v**3)/3 - w + params['I_ext'] + I_syn
+        dw[:] = (v + a - b*w) / tau
+        if self.plastic:
+            delta_v = v[self.pre] - v[self.post]
+            dM[:] = params['alpha'] * (delta_v**2) * (1 - M) - params['beta'] * M
+        return d
+
+    def _jacobian_entries(self, state, params):
+        """Rows, columns and values of the structurally non-zero Jacobian entries"""
+        v, w, M = self.split_state(np.asarray(state))
+        N, E = self.n_neurons, self.n_edges
+        b, tau = params['b'], params['tau']
+        neurons = np.arange(N)
+        weights = M if self.plastic else np.full(E, float(params['g']))
+        in_weight = np.bincount(self.post, weights, minlength=N)
+
+        rows = [neurons, self.post, neurons, N + neurons, N + neurons]
+        cols = [neurons, self.pre, N + neurons, neurons, N + neurons]
+        vals = [1 - v**2 - in_weight, weights, np.full(N, -1.0),
+                np.full(N, 1.0 / tau), np.full(N, -b / tau)]
+
+        if self.plastic:
+            edges = 2*N + np.arange(E)
+            delta_v = v[self.pre] - v[self.post]
+            dM_dv = 2 * params['alpha'] * delta_v * (1 - M)
+            rows += [self.post, edges, edges, edges]
+            cols += [edges, self.pre, self.post, edges]
+            vals += [delta_v, dM_dv, -dM_dv, -params['alpha'] * delta_v**2 - params['beta']]
+
+        return np.concatenate(rows), np.concatenate(cols), np.concatenate(vals)
+
+    def jacobian(self, state, t, params):
+        """
+        Analytic Jacobian of rhs as a sparse matrix
+
+        Only the N + E + ... structurally non-zero entries are built, so
+        implicit solvers (solve_ivp BDF/Radau) need no finite-difference
+        RHS calls to form it.
+
+        Returns:
+        --------
+        J : scipy.sparse.csr_matrix, shape (state_size, state_size)
+        """
+        rows, cols, vals = self._jacobian_entries(state, params)
+        n = self.state_size
+        return sparse.csr_matrix((vals, (rows, cols)), shape=(n, n))
+
+    def band_ordering(self):
+        """
+        State permutation that gives the Jacobian a narrow band
+
+        Reverse Cuthill-McKee on the (graph-determined) sparsity pattern
+        of the Jacobian; computed once and cached. For ring and
+        small-world graphs the bandwidth is a small multiple of the
+        degree, for random graphs it can approach the state size.
+
+        Returns:
+        --------
+        perm : array of int
+            State index stored at each position of the permuted state
+        ml, mu : int
+            Lower and upper bandwidth of the permuted Jacobian
+        """
+        if self._band is None:
+            n = self.state_size
+            rows, cols, _ = self._jacobian_entries(np.zeros(n), _PATTERN_PARAMS)
+            pattern = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n))
+            perm = reverse_cuthill_mckee((pattern + pattern.T).tocsr(), symmetric_mode=True)
+            perm = np.asarray(perm, dtype=np.int64)
+            position = np.empty(n, dtype=np.int64)
+            position[perm] = np.arange(n)
+            offset = position[rows] - position[cols]
+            self._band = (perm, int(max(offset.max(initial=0), 0)),
+                          int(max(-offset.min(initial=0), 0)))
+        return self._band
+
+    def _banded_system(self, params):
+        """
+        RHS and banded Jacobian of the band-ordered system
+
+        Returns fun(y, t), jac(y, t) on permuted states, the permutation
+        and (ml, mu); jac follows odeint's banded storage
+        band[i - j + mu, j] = J[i, j].
+        """
+        perm, ml, mu = self.band_ordering()
+        n = self.state_size
+        position = np.empty(n, dtype=np.int64)
+        position[perm] = np.arange(n)
+
+        def fun(y, t):
+            state = np.empty(n)
+            state[perm] = y
+            return self.rhs(state, t, params)[perm]
+
+        def jac(y, t):
+            state = np.empty(n)
+            state[perm] = y
+            rows, cols, vals = self._jacobian_entries(state, params)
+            i, j = position[rows], position[cols]
+            band = np.zeros((ml + mu + 1, n))
+            np.add.at(band, (i - j + mu, j), vals)
+            return band
+
+        return fun, jac, perm, ml, mu
+
+    def simulate(self, initial_state, t, params, method='rk4', substeps=1, **odeint_kwargs):
+        """
+        Integrate the network
+
+        Parameters:
+        -----------
+        initial_state : array, shape (state_size,)
+            E.g. from initial_state()
+        t : array
+            Output time points
+        params : dict
+            See rhs
+        method : str
+            'odeint' for scipy's adaptive solver, or 'LSODA' for the same
+            solver through solve_ivp, both given the analytic Jacobian in
+            banded form on the band_ordering of the state; 'BDF' or
+            'Radau' for solve_ivp with the sparse analytic Jacobian; or a
+            fixed-step method of integrators.odeint_fixed ('rk4', 'heun',
+            'euler', ...), which is usually fastest for large networks
+            ('semi_implicit_euler' solves with the sparse Jacobian)
+        substeps : int
+            Fixed-step substeps per output interval
+        **odeint_kwargs
+            Passed on to odeint or solve_ivp (e.g. rtol, atol)
+
+        Returns:
+        --------
+        solution : array, shape (len(t), state_size)
+            Use split_state to get v, w and M
+        """
+        if method in ('odeint', 'LSODA'):
+            fun, jac, perm, ml, mu = self._banded_system(params)
+            y0 = np.asarray(initial_state, dtype=float)[perm]
+            if method == 'odeint':
+                permuted = odeint(fun, y0, t, Dfun=jac, ml=ml, mu=mu, **odeint_kwargs)
+            else:
+                permuted = solve_ivp(lambda tt, y: fun(y, tt), (t[0], t[-1]), y0, method='LSODA',
+                                     t_eval=t, jac=lambda tt, y: jac(y, tt), lband=ml, uband=mu,
+                                     **odeint_kwargs).y.T
+            solution = np.empty_like(permuted)
+            solution[:, perm] = permuted
+            return solution
+        if method in ('BDF', 'Radau'):
+            sol = solve_ivp(lambda tt, y: self.rhs(y, tt, params), (t[0], t[-1]), initial_state,
+                            method=method, t_eval=t,
+                            jac=lambda tt, y: self.jacobian(y, tt, params), **odeint_kwargs)
+            return sol.y.T
+        return odeint_fixed(self.rhs, initial_state, t, args=(params,), method=method,
+                            substeps=substeps, Dfun=self.jacobian)
+
+
+# ============================================================================
+# COUPLED LATTICES OF MEMRISTIVE FHN MAPS
+# ============================================================================
+
+class MapLattice:
+    """
+    N memristive FHN maps coupled to their neighbours
+
+    Each site follows memristive_fhn_map plus a memristive coupling
+    current in the x equation,
+
+        x_i' = x_i - x_i^3/3 - y_i + I_ext + k1 z_i x_i
+               + (eps + eps_m z_i) * sum_j (x_j - x_i),
+
+    where the sum runs over the neighbours of site i and the coupling
+    memductance is linear in the site's memristor state z_i, like the
+    k1*z*x self-term. The y and z updates are unchanged. The update
+    writes into a preallocated (N, 3) buffer using a few length-N
+    scratch arrays, so memory stays at a handful of N-vectors even for
+    10^6 sites. Unlike memristive_fhn_map there is no MAX_VAL check;
+    diverging sites turn into inf/NaN.
+
+    Parameters:
+    -----------
+    topology : int, tuple or sparse matrix
+        n or (n,) for a 1D chain, (rows, cols) for a 2D grid (site index
+        r*cols + c, 4 neighbours), or an (N, N) adjacency matrix with
+        A[i, j] != 0 if j is a neighbour of i
+    boundary : str
+        Grid boundaries: 'periodic', or 'fixed' (sites beyond the edge
+        are held at x = boundary_value)
+    boundary_value : float
+        x of the fixed boundary sites
+    """
+
+    def __init__(self, topology, boundary='periodic', boundary_value=0.0):
+        if boundary not in ('periodic', 'fixed'):
+            raise ValueError(f"Unknown boundary '{boundary}', expected 'periodic' or 'fixed'")
+        self.boundary = boundary
+        self.boundary_value = float(boundary_value)
+
+        if sparse.issparse(topology):
+            A = sparse.csr_matrix(topology, dtype=float)
+            A.setdiag(0)
+            A.eliminate_zeros()
+            A.data[:] = 1.0
+            self.adjacency = A
+            self.shape = (A.shape[0],)
+            self._degree = np.asarray(A.sum(axis=1)).ravel()
+        else:
+            self.adjacency = None
+            self.shape = tuple(np.atleast_1d(topology).astype(int))
+            if len(self.shape) not in (1, 2):
+                raise ValueError(f"Grid must be 1D or 2D, got shape {self.shape}")
+        self.n_sites = int(np.prod(self.shape))
+
+        self._lap = np.empty(self.n_sites)
+        self._tmp = np.empty(self.n_sites)
+        self._tmp2 = np.empty(self.n_sites)
+
+    def _neighbour_sum(self, x, out):
+        """out = sum over neighbours of (x_j - x_i)"""
+        if self.adjacency is not None:
+            out[:] = self.adjacency @ x
+            out -= self._degree * x
+            return out
+
+        # Grid: add both neighbours along each axis (the last axis of the
+        # grid itself, then of its transpose for the rows of a 2D grid)
+        g, o = x.reshape(self.shape), out.reshape(self.shape)
+        axes = [(g, o)] if len(self.shape) == 1 else [(g, o), (g.T, o.T)]
+
+        out.fill(0.0)
+        for g, o in axes:
+            o[..., 1:] += g[..., :-1]
+            o[..., :-1] += g[..., 1:]
+            if self.boundary == 'periodic':
+                o[..., 0] += g[..., -1]
+                o[..., -1] += g[..., 0]
+            else:
+                o[..., 0] += self.boundary_value
+                o[..., -1] += self.boundary_value
+        for _ in range(2 * len(self.shape)):
+            out -= x
+        return out
+
+    def step(self, state, params, out):
+        """
+        One lattice update, written into out
+
+        Parameters:
+        -----------
+        state : array, shape (N, 3)
+            Current [x, y, z] of every site
+        params : dict
+            'gamma', 'theta', 'delta', 'I_ext', 'k1', 'k2', 'eps' and
+            optionally 'eps_m' (default 0); scalars or arrays of shape (N,)
+        out : array, shape (N, 3)
+            Buffer for the next state (must not be state)
+
+        Returns:
+        --------
+        out : array, shape (N, 3)
+        """
+        x, y, z = state[:, 0], state[:, 1], state[:, 2]
+        lap, t1, t2 = self._lap, self._tmp, self._tmp2
+        self._neighbour_sum(x, lap)
+
+        # Coupling current (eps + eps_m z) * lap
+        np.multiply(z, params.get('eps_m', 0.0), out=t1)
+        t1 += params['eps']
+        lap *= t1
+
+        # x' = x - x^3/3 - y + I_ext + k1 z x + coupling
+        np.multiply(x, x, out=t1)
+        t1 *= x
+        t1 *= -1.0 / 3.0
+        t1 += x
+        t1 -= y
+        t1 += params['I_ext']
+        np.multiply(z, x, out=t2)
+        t2 *= params['k1']
+        t1 += t2
+        t1 += lap
+
+        # y' = gamma y + theta x + delta
+        np.multiply(x, params['theta'], out=t2)
+        t2 += params['delta']
+        np.multiply(y, params['gamma'], out=out[:, 1])
+        out[:, 1] += t2
+
+        # z' = z + sin(z) - k2 x
+        np.sin(z, out=t2)
+        t2 += z
+        np.multiply(x, params['k2'], out=lap)
+        t2 -= lap
+        out[:, 2] = t2
+        out[:, 0] = t1
+        return out
+
+    def iterate(self, initial_state, params, n_steps, transient=0, record_every=0,
+                variable=0):
+        """
+        Iterate the lattice with two alternating (N, 3) buffers
+
+        Parameters:
+        -----------
+        initial_state : array, shape (N, 3) or (3,)
+            Initial [x, y, z] per site (or shared by all sites)
+        params : dict
+            See step
+        n_steps : int
+            Number of iterations
+        transient : int
+            Steps before recording starts
+        record_every : int
+            Record one variable every record_every steps after the
+            transient (0 records nothing)
+        variable : int
+            Variable to record (0=x, 1=y, 2=z)
+
+        Returns:
+        --------
+        state : array, shape (N, 3)
+            Final state
+        snapshots : array, shape (n_records, N) or None
+            Recorded values of the chosen variable (reshape each row to
+            the grid shape for 2D lattices)
+        """
+        a = np.array(np.broadcast_to(np.asarray(initial_state, dtype=float),
+                                     (self.n_sites, 3)))
+        b = np.empty_like(a)
+
+        snapshots = None
+        if record_every > 0:
+            n_records = n_recorded_steps(n_steps, transient, record_every)
+            snapshots = np.empty((n_records, self.n_sites))
+        j = 0
+
+        with np.errstate(over='ignore', invalid='ignore'):
+            for i in range(n_steps):
+                self.step(a, params, b)
+                a, b = b, a
+                if snapshots is not None and i >= transient and (i - transient) % record_every == 0:
+                    snapshots[j] = a[:, variable]
+                    j += 1
+
+        return a, snapshots
@@ -0,0 +1,216 @@
+"""
+Orbit classification for the discrete memristive FHN map
+Labels each trajectory as fixed point, period-k, quasi-periodic, chaotic
+or divergent from its streamed state, without storing the trajectory
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from map_analysis import evaluate_plane, tangent_lyapunov
+from utils import broadcast_map_batch, memristive_fhn_jacobian_batch, memristive_fhn_map_batch
+
+
+# ============================================================================
+# ORBIT TYPES
+# ============================================================================
+
+# Integer codes returned by classify_orbits, and their names
+DIVERGENT = -1
+FIXED = 1
+PERIODIC = 2
+QUASI_PERIODIC = 3
+CHAOTIC = 4
+
+ORBIT_NAMES = {
+    DIVERGENT: 'divergent',
+    FIXED: 'fixed',
+    PERIODIC: 'periodic',
+    QUASI_PERIODIC: 'quasi-periodic',
+    CHAOTIC: 'chaotic',
+}
+
+OrbitClass = namedtuple('OrbitClass', ['kind', 'period', 'lyapunov'])
+OrbitClass.__doc__ = """
+Classification of a single orbit
+
+kind : str
+    'fixed', 'periodic', 'quasi-periodic', 'chaotic' or 'divergent'
+period : int
+    Period k for fixed (1) and periodic orbits; 0 if the orbit is
+    periodic by its Lyapunov exponent but longer than max_period, or not
+    periodic at all
+lyapunov : float
+    Largest Lyapunov exponent: exact for fixed points and detected
+    cycles, a tangent-vector estimate otherwise (NaN if the orbit
+    diverged)
+"""
+
+
+def orbit_label(result):
+    """Readable label for an OrbitClass, such as 'fixed', 'period-3' or 'chaotic'"""
+    if result.kind == ORBIT_NAMES[PERIODIC] and result.period > 0:
+        return f"period-{result.period}"
+    return result.kind
+
+
+# ============================================================================
+# BATCHED CLASSIFIER
+# ============================================================================
+
+def _iterate_live(state, param_arrays, live, n_steps):
+    """Advance the rows in live by n_steps, dropping rows that diverge"""
+    for _ in range(n_steps):
+        if live.size == 0:
+            break
+        new = memristive_fhn_map_batch(state[live], {k: v[live] for k, v in param_arrays.items()})
+        state[live] = new
+        live = live[np.isfinite(new).all(axis=1)]
+    return live
+
+
+def classify_orbits(initial_states, params, transient=2000, window=64, n_lyapunov=1000,
+                    max_period=16, tol=1e-6, lyap_tol=5e-3, block=100):
+    """
+    Classify the orbits of N trajectories of the memristive FHN map
+
+    After the transient, a period is looked for with a return-map check:
+    the orbit has period k if |s_n - s_{n-k}| <= tol for every step of
+    the last window steps (the smallest such k <= max_period is
+    reported); their largest Lyapunov exponent follows exactly from the
+    Jacobians along the cycle. Orbits without a detected period are told
+    apart by the sign of their largest Lyapunov exponent (single tangent
+    vector): > lyap_tol chaotic, within +-lyap_tol quasi-periodic,
+    < -lyap_tol a periodic orbit longer than max_period. Only the
+    current state and a ring of the last max_period states are kept per
+    trajectory.
+
+    Parameters:
+    -----------
+    initial_states : array, shape (N, 3) or (3,)
+        Initial [x, y, z] for each trajectory
+    params : dict
+        Map parameters; each value is a scalar or an array of shape (N,)
+    transient : int
+        Steps iterated first to land on the attractor
+    window : int
+        Steps over which the return-map check must hold
+    n_lyapunov : int
+        Steps over which the Lyapunov exponent is averaged
+    max_period : int
+        Longest period tested directly
+    tol : float
+        Return-map tolerance (max-abs distance between states)
+    lyap_tol : float
+        Band around zero treated as a zero Lyapunov exponent
+    block : int
+        Steps between divergence checks during the transient
+
+    Returns:
+    --------
+    kind : array of int, shape (N,)
+        FIXED, PERIODIC, QUASI_PERIODIC, CHAOTIC or DIVERGENT
+    period : array of int, shape (N,)
+        Detected period (0 if none)
+    lyapunov : array, shape (N,)
+        Largest Lyapunov exponent (NaN for divergent orbits)
+    """
+    state, param_arrays = broadcast_map_batch(initial_states, params)
+    n = len(state)
+    kind = np.full(n, DIVERGENT)
+    period = np.zeros(n, dtype=int)
+    lyapunov = np.full(n, np.nan)
+
+    with np.errstate(invalid='ignore', over='ignore'):
+        # Transient, in blocks so diverged rows stop costing time
+        live = np.arange(n)
+        for start in range(0, transient, block):
+            live = _iterate_live(state, param_arrays, live, min(block, transient - start))
+
+        # Return-map check: running max of |s_n - s_{n-k}| over the window
+        P = max_period
+        ring = np.empty((live.size, P, 3))
+        ring[:, 0] = state[live]
+        deviation = np.zeros((live.size, P))
+        p_state = state[live]
+        p_params = {k: v[live] for k, v in param_arrays.items()}
+        lags = np.arange(1, P + 1)
+        for i in range(1, window + P + 1):
+            p_state = memristive_fhn_map_batch(p_state, p_params)
+            if i >= P:
+                diff = np.abs(ring[:, (i - lags) % P] - p_state[:, None, :]).max(axis=2)
+                np.maximum(deviation, diff, out=deviation)
+            ring[:, i % P] = p_state
+
+        finite = np.isfinite(p_state).all(axis=1) & np.isfinite(deviation).all(axis=1)
+        matched = (deviation <= tol) & finite[:, None]
+        found = matched.any(axis=1)
+        period[live[found]] = lags[matched[found].argmax(axis=1)]
+        kind[live[found]] = np.where(period[live[found]] == 1, FIXED, PERIODIC)
+
+        # Exponent of the detected cycles from their monodromy matrix (the
+        # product of the Jacobians at the p states of the cycle, from the
+        # ring): lambda = log(spectral radius) / p
+        for p in np.unique(period[live[found]]):
+            rows = np.flatnonzero(found & (period[live] == p))
+            c_params = {k: v[live[rows]] for k, v in param_arrays.items()}
+            M = np.broadcast_to(np.eye(3), (rows.size, 3, 3))
+            for j in range(p - 1, -1, -1):
+                M = memristive_fhn_jacobian_batch(ring[rows, (i - j) % P], c_params) @ M
+            with np.errstate(divide='ignore'):
+                lyapunov[live[rows]] = np.log(np.abs(np.linalg.eigvals(M)).max(axis=1)) / p
+
+        # Lyapunov sign for the rest
+        rest = finite & ~found
+        rows = live[rest]
+        l_params = {k: v[rows] for k, v in param_arrays.items()}
+        lam = tangent_lyapunov(p_state[rest], l_params, n_lyapunov, n_exponents=1)[0][:, 0]
+        ok = np.isfinite(lam)
+        lyapunov[rows[ok]] = lam[ok]
+        kind[rows[ok]] = np.select([lam[ok] > lyap_tol, lam[ok] < -lyap_tol],
+                                   [CHAOTIC, PERIODIC], QUASI_PERIODIC)
+
+    return kind, period, lyapunov
+
+
+def classify_orbit(initial_state, params, **kwargs):
+    """
+    Classify a single orbit (see classify_orbits for the keyword arguments)
+
+    Returns:
+    --------
+    result : OrbitClass
+        (kind, period, lyapunov) with kind as a string
+    """
+    kind, period, lyapunov = classify_orbits(initial_state, params, **kwargs)
+    return OrbitClass(ORBIT_NAMES[int(kind[0])], int(period[0]), float(lyapunov[0]))
+
+
+def classify_orbit_grid(base_params, x_name, x_values, y_name, y_values,
+                        initial_state=(0.01, 0.02, 0.1), batch_size=20000, **kwargs):
+    """
+    Orbit types over a 2D parameter plane, e.g. (theta, k1)
+
+    Parameters:
+    -----------
+    base_params : dict
+        Fixed map parameters
+    x_name, y_name : str
+        Swept parameter names
+    x_values, y_values : array
+        Values along each axis
+    initial_state : array, shape (3,)
+        Initial [x, y, z] for every cell
+    batch_size : int
+        Number of cells classified together (bounds memory use)
+    **kwargs
+        Passed to classify_orbits
+
+    Returns:
+    --------
+    kind, period, lyapunov : arrays, shape (len(y_values), len(x_values))
+        As for classify_orbits, x varying along columns
+    """
+    return evaluate_plane(lambda chunk: classify_orbits(initial_state, chunk, **kwargs),
+                          base_params, x_name, x_values, y_name, y_values, batch_size)
@@ -0,0 +1,234 @@
+"""
+On-disk trajectory store built on memory-mapped .npy files
+Each dataset is a .npy array plus a metadata sidecar (.json for scalars,
+.npz for array-valued entries such as swept parameters)
+"""
+
+import json
+import os
+
+import numpy as np
+
+from accel import iterate_memristive_fhn_fast
+from utils import (block_length, broadcast_map_batch, iterate_memristive_fhn_batch,
+                   n_recorded_steps)
+
+
+# ============================================================================
+# METADATA SIDECAR
+# ============================================================================
+
+def _split_arrays(meta, arrays, prefix=''):
+    """JSON-safe copy of meta; arrays are moved to the arrays dict by dotted key"""
+    plain = {}
+    for key, value in meta.items():
+        path = prefix + str(key)
+        if isinstance(value, dict):
+            plain[key] = _split_arrays(value, arrays, path + '.')
+        elif isinstance(value, np.generic):
+            plain[key] = value.item()
+        elif isinstance(value, (np.ndarray, list, tuple)) and np.ndim(value) > 0:
+            value = np.asarray(value)
+            if value.dtype.kind in 'biuf' and value.ndim == 1 and value.size <= 16:
+                # Short vectors (initial states, ...) stay readable in the JSON
+                plain[key] = value.tolist()
+            else:
+                arrays[path] = value
+                plain[key] = {'__array__': path}
+        else:
+            plain[key] = value
+    return plain
+
+
+def _join_arrays(meta, arrays):
+    """Inverse of _split_arrays"""
+    joined = {}
+    for key, value in meta.items():
+        if isinstance(value, dict) and '__array__' in value:
+            joined[key] = arrays[value['__array__']]
+        elif isinstance(value, dict):
+            joined[key] = _join_arrays(value, arrays)
+        else:
+            joined[key] = value
+    return joined
+
+
+# ============================================================================
+# STORE
+# ============================================================================
+
+class TrajectoryStore:
+    """
+    Directory of named, memory-mapped trajectory datasets
+
+    Datasets are created at full size up front and filled in place, so
+    the iterators can write straight to disk and readers can open a
+    slice (store.open('run')[:, ::10]) without loading the whole run.
+
+    Parameters:
+    -----------
+    root : str
+        Directory holding the datasets (created if missing)
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, name, ext):
+        return os.path.join(self.root, name + ext)
+
+    def names(self):
+        """Names of all datasets in the store"""
+        return sorted(entry[:-5] for entry in os.listdir(self.root) if entry.endswith('.json'))
+
+    def __contains__(self, name):
+        return os.path.exists(self._path(name, '.json'))
+
+    def _write_meta(self, name, meta):
+        arrays = {}
+        plain = _split_arrays(meta, arrays)
+        if arrays:
+            np.savez(self._path(name, '.npz'), **arrays)
+        tmp_path = self._path(name, '.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(plain, f, indent=1)
+        os.replace(tmp_path, self._path(name, '.json'))
+
+    def metadata(self, name):
+        """
+        Sidecar metadata of a dataset
+
+        Returns:
+        --------
+        meta : dict
+            'shape', 'dtype', 'complete' plus whatever was recorded at
+            creation (params, initial_state, n_steps, transient, ...)
+        """
+        with open(self._path(name, '.json')) as f:
+            meta = json.load(f)
+        arrays = {}
+        if os.path.exists(self._path(name, '.npz')):
+            with np.load(self._path(name, '.npz'), allow_pickle=False) as data:
+                arrays = {key: data[key] for key in data.files}
+        return _join_arrays(meta, arrays)
+
+    def create(self, name, shape, dtype=float, **meta):
+        """
+        Allocate a new dataset and write its sidecar
+
+        Parameters:
+        -----------
+        name : str
+            Dataset name (file stem)
+        shape : tuple
+            Array shape
+        dtype : dtype
+            Element type
+        **meta
+            Metadata to record, e.g. params, initial_state, n_steps,
+            transient (arrays are stored in the .npz sidecar)
+
+        Returns:
+        --------
+        data : np.memmap
+            Writable memory map of the new dataset
+        """
+        if name in self:
+            raise ValueError(f"Dataset '{name}' already exists in {self.root}")
+        data = np.lib.format.open_memmap(self._path(name, '.npy'), mode='w+',
+                                         dtype=dtype, shape=tuple(shape))
+        self._write_meta(name, dict(meta, shape=list(data.shape), dtype=data.dtype.str,
+                                    complete=False))
+        return data
+
+    def mark_complete(self, name, data=None):
+        """Flush data (if given) and flag the dataset as fully written"""
+        if data is not None:
+            data.flush()
+        meta = self.metadata(name)
+        meta['complete'] = True
+        self._write_meta(name, meta)
+
+    def open(self, name, mode='r'):
+        """
+        Memory map of a dataset
+
+        Parameters:
+        -----------
+        name : str
+            Dataset name
+        mode : str
+            'r' (read-only), 'r+' (read-write) or 'c' (copy-on-write)
+
+        Returns:
+        --------
+        data : np.memmap
+        """
+        return np.load(self._path(name, '.npy'), mmap_mode=mode)
+
+    def save(self, name, array, **meta):
+        """Store an in-memory array (e.g. a notebook result) as a dataset"""
+        array = np.asarray(array)
+        data = self.create(name, array.shape, array.dtype, **meta)
+        data[...] = array
+        self.mark_complete(name, data)
+        return data
+
+    def delete(self, name):
+        """Remove a dataset and its sidecar"""
+        for ext in ('.npy', '.json', '.npz'):
+            if os.path.exists(self._path(name, ext)):
+                os.remove(self._path(name, ext))
+
+    # ------------------------------------------------------------------------
+    # Simulation into the store
+    # ------------------------------------------------------------------------
+
+    def iterate_map(self, name, initial_state, params, n_steps, transient=0,
+                    record_every=1, backend=None):
+        """
+        Run iterate_memristive_fhn_fast and write the trajectory to disk
+
+        Returns:
+        --------
+        data : np.memmap, shape (n_recorded, 3)
+        """
+        n_recorded = n_recorded_steps(n_steps, transient, record_every)
+        data = self.create(name, (n_recorded, 3), params=dict(params),
+                           initial_state=np.asarray(initial_state, dtype=float),
+                           n_steps=n_steps, transient=transient, record_every=record_every)
+        iterate_memristive_fhn_fast(initial_state, params, n_steps, transient,
+                                    record_every=record_every, out=data, backend=backend)
+        self.mark_complete(name, data)
+        return data
+
+    def iterate_map_batch(self, name, initial_states, params, n_steps, transient=0):
+        """
+        Run iterate_memristive_fhn_batch and write the trajectories to disk
+
+        Array-valued params (swept parameters) and initial states are
+        kept in the .npz sidecar. Rows are simulated in blocks that fit
+        utils.WRITE_BUFFER_BYTES, so each block is written to disk as
+        contiguous slabs.
+
+        Returns:
+        --------
+        data : np.memmap, shape (N, n_steps - transient, 3)
+        """
+        initial_states = np.asarray(initial_states, dtype=float)
+        states, param_arrays = broadcast_map_batch(initial_states, params)
+        n = len(states)
+        data = self.create(name, (n, max(n_steps - transient, 0), 3), params=dict(params),
+                           initial_state=initial_states, n_steps=n_steps, transient=transient)
+
+        # Blocks of whole rows are contiguous on disk: run as many rows
+        # together as fit in the write buffer
+        rows = block_length(data[:1].nbytes)
+        for start in range(0, n, rows):
+            stop = min(start + rows, n)
+            iterate_memristive_fhn_batch(states[start:stop],
+                                         {key: value[start:stop] for key, value in param_arrays.items()},
+                                         n_steps, transient, out=data[start:stop])
+        self.mark_complete(name, data)
+        return data
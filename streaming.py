@@ -0,0 +1,278 @@
+"""
+Streaming iteration of the memristive FHN map with constant memory
+Yields the trajectory in fixed-size blocks and reduces it on the fly
+"""
+
+import numpy as np
+
+from accel import iterate_memristive_fhn_fast
+
+
+# ============================================================================
+# CHUNKED TRAJECTORY GENERATOR
+# ============================================================================
+
+def iter_memristive_fhn_chunks(initial_state, params, n_steps, transient=0,
+                               chunk_size=10000, backend=None):
+    """
+    Iterate the memristive FHN map and yield the trajectory block by block
+
+    Concatenating the blocks gives the same states as
+    iterate_memristive_fhn(initial_state, params, n_steps, transient),
+    but only one block is held in memory at a time. The generator stops
+    early after the block in which the trajectory diverges.
+
+    Parameters:
+    -----------
+    initial_state : array, shape (3,)
+        Initial [x, y, z]
+    params : dict
+        Must contain: 'gamma', 'theta', 'delta', 'I_ext', 'k1', 'k2'
+    n_steps : int
+        Number of iterations
+    transient : int
+        Number of initial steps to discard
+    chunk_size : int
+        Number of states per block (the last block may be shorter)
+    backend : str, optional
+        Backend passed to accel.iterate_memristive_fhn_fast
+
+    Yields:
+    -------
+    block : array, shape (<= chunk_size, 3)
+        Consecutive states after the transient
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be >= 1, got {chunk_size}")
+
+    state = np.array(initial_state, dtype=float)
+    if transient > 0:
+        # Only the last transient state is needed to continue
+        last = iterate_memristive_fhn_fast(state, params, min(transient, n_steps),
+                                           transient - 1, backend=backend)
+        if len(last) == 0:
+            return
+        state = last[-1]
+
+    remaining = n_steps - transient
+    while remaining > 0:
+        m = min(chunk_size, remaining)
+        block = iterate_memristive_fhn_fast(state, params, m, backend=backend)
+        yield block
+
+        state = block[-1]
+        if not np.all(np.isfinite(state)):
+            return
+        remaining -= m
+
+
+def _finite_rows(block):
+    return block[np.isfinite(block).all(axis=1)]
+
+
+# ============================================================================
+# ONLINE REDUCERS
+# ============================================================================
+# Each reducer is fed blocks of shape (n, 3) through update() and keeps
+# O(1) state (independent of the run length). Non-finite rows are skipped.
+
+class RunningRange:
+    """Per-variable minimum and maximum"""
+
+    def __init__(self):
+        self.min = np.full(3, np.inf)
+        self.max = np.full(3, -np.inf)
+
+    def update(self, block):
+        block = _finite_rows(block)
+        if len(block):
+            np.minimum(self.min, block.min(axis=0), out=self.min)
+            np.maximum(self.max, block.max(axis=0), out=self.max)
+
+
+class RunningMoments:
+    """
+    Per-variable count, mean and variance
+
+    Blocks are merged with the pairwise update of Chan et al., which is
+    numerically stable for very long runs.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = np.zeros(3)
+        self._m2 = np.zeros(3)
+
+    def update(self, block):
+        block = _finite_rows(block)
+        n_b = len(block)
+        if n_b == 0:
+            return
+
+        mean_b = block.mean(axis=0)
+        m2_b = ((block - mean_b)**2).sum(axis=0)
+
+        n = self.count + n_b
+        delta = mean_b - self.mean
+        self.mean = self.mean + delta * n_b / n
+        self._m2 = self._m2 + m2_b + delta**2 * self.count * n_b / n
+        self.count = n
+
+    @property
+    def var(self):
+        """Population variance (as np.var)"""
+        if self.count == 0:
+            return np.full(3, np.nan)
+        return self._m2 / self.count
+
+
+class RunningHistogram:
+    """
+    Histogram of one variable over fixed bin edges
+
+    Parameters:
+    -----------
+    bins : int or array
+        Number of bins, or the bin edges
+    value_range : tuple, optional
+        (low, high) used when bins is an int
+    column : int
+        Variable to histogram (0=x, 1=y, 2=z)
+    """
+
+    def __init__(self, bins=200, value_range=(-5.0, 5.0), column=0):
+        if np.ndim(bins) == 0:
+            bins = np.linspace(value_range[0], value_range[1], int(bins) + 1)
+        self.edges = np.asarray(bins, dtype=float)
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.column = column
+
+    def update(self, block):
+        block = _finite_rows(block)
+        self.counts += np.histogram(block[:, self.column], bins=self.edges)[0]
+
+
+class UniquePointCounter:
+    """
+    Count distinct rounded values of one variable (periodicity test)
+
+    Streaming version of len(np.unique(np.round(x, decimals))) from
+    misc/find_chaos.py. Counting stops at max_unique, so memory stays
+    bounded even for chaotic orbits; a period-p orbit gives p.
+
+    Parameters:
+    -----------
+    decimals : int
+        Rounding precision
+    column : int
+        Variable to test (0=x, 1=y, 2=z)
+    max_unique : int
+        Stop storing new values beyond this many
+    """
+
+    def __init__(self, decimals=4, column=0, max_unique=1000):
+        self.decimals = decimals
+        self.column = column
+        self.max_unique = max_unique
+        self._seen = set()
+
+    def update(self, block):
+        if len(self._seen) >= self.max_unique:
+            return
+        values = np.unique(np.round(_finite_rows(block)[:, self.column], self.decimals))
+        for value in values.tolist():
+            self._seen.add(value)
+            if len(self._seen) >= self.max_unique:
+                break
+
+    @property
+    def n_unique(self):
+        return len(self._seen)
+
+    @property
+    def saturated(self):
+        """True if the count hit max_unique (many distinct points)"""
+        return len(self._seen) >= self.max_unique
+
+
+def reduce_chunks(chunks, reducers):
+    """
+    Feed every block from a chunk generator to a set of reducers
+
+    Parameters:
+    -----------
+    chunks : iterable of arrays, shape (n, 3)
+        E.g. iter_memristive_fhn_chunks(...)
+    reducers : list
+        Objects with an update(block) method
+
+    Returns:
+    --------
+    n_states : int
+        Number of states consumed
+    diverged : bool
+        True if a non-finite state was seen
+    """
+    n_states = 0
+    diverged = False
+    for block in chunks:
+        n_states += len(block)
+        diverged = diverged or not np.all(np.isfinite(block[-1]))
+        for reducer in reducers:
+            reducer.update(block)
+    return n_states, diverged
+
+
+def stream_statistics(initial_state, params, n_steps, transient=0,
+                      chunk_size=10000, bins=200, value_range=(-5.0, 5.0),
+                      decimals=4, max_unique=1000, backend=None):
+    """
+    Trajectory statistics of a long run computed in constant memory
+
+    Parameters:
+    -----------
+    initial_state : array, shape (3,)
+        Initial [x, y, z]
+    params : dict
+        System parameters
+    n_steps : int
+        Number of iterations
+    transient : int
+        Number of initial steps to discard
+    chunk_size : int
+        States per block
+    bins, value_range : int/array, tuple
+        Histogram of x
+    decimals, max_unique : int
+        Unique-point periodicity test on x
+    backend : str, optional
+        Backend passed to accel.iterate_memristive_fhn_fast
+
+    Returns:
+    --------
+    stats : dict
+        'n_states', 'diverged', 'min', 'max', 'mean', 'var', 'mean_z',
+        'hist_counts', 'hist_edges', 'n_unique', 'unique_saturated'
+    """
+    rng = RunningRange()
+    moments = RunningMoments()
+    hist = RunningHistogram(bins, value_range, column=0)
+    unique = UniquePointCounter(decimals, column=0, max_unique=max_unique)
+
+    chunks = iter_memristive_fhn_chunks(initial_state, params, n_steps, transient,
+                                        chunk_size=chunk_size, backend=backend)
+    n_states, diverged = reduce_chunks(chunks, [rng, moments, hist, unique])
+
+    return {
+        'n_states': n_states,
+        'diverged': diverged,
+        'min': rng.min,
+        'max': rng.max,
+        'mean': moments.mean,
+        'var': moments.var,
+        'mean_z': moments.mean[2],
+        'hist_counts': hist.counts,
+        'hist_edges': hist.edges,
+        'n_unique': unique.n_unique,
+        'unique_saturated': unique.saturated,
+    }
@@ -0,0 +1,401 @@
+"""
+Parallel parameter sweeps over a process pool
+Runs one simulation per grid point and returns results in grid order
+"""
+
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from integrators import odeint_events
+from orbits import classify_orbit_grid
+from utils import integrate_ode, iterate_memristive_fhn
+
+
+# ============================================================================
+# PARAMETER GRIDS
+# ============================================================================
+
+def parameter_grid(base_params, **axes):
+    """
+    Cartesian product of parameter values on top of a base parameter dict
+
+    Example: parameter_grid(FHN_PARAMS, beta=beta_range, alpha=alpha_range)
+    gives len(beta_range) * len(alpha_range) dicts, alpha varying fastest.
+
+    Parameters:
+    -----------
+    base_params : dict
+        Parameters shared by every grid point (e.g. a config.py dict)
+    **axes : arrays
+        Values for each swept parameter, in row-major order
+
+    Returns:
+    --------
+    grid : list of dict
+        One parameter dict per grid point (row-major / C order)
+    shape : tuple
+        Grid shape, to reshape the sweep results
+    """
+    names = list(axes)
+    values = [np.asarray(axes[name]).ravel() for name in names]
+    shape = tuple(len(v) for v in values)
+
+    grid = []
+    for combo in itertools.product(*values):
+        params = dict(base_params)
+        for name, value in zip(names, combo):
+            params[name] = value.item() if hasattr(value, 'item') else value
+        grid.append(params)
+
+    return grid, shape
+
+
+# ============================================================================
+# SIMULATION TASKS
+# ============================================================================
+# Tasks are callables task(params) -> result. They are sent to worker
+# processes, so they must be picklable: use these classes, module-level
+# functions or functools.partial (not lambdas or notebook-local closures).
+
+class MapRun:
+    """
+    Memristive FHN map run: iterate_memristive_fhn(initial_state, params, ...)
+
+    Parameters:
+    -----------
+    initial_state : array, shape (3,)
+        Initial [x, y, z]
+    n_steps : int
+        Number of iterations
+    transient : int
+        Number of initial steps to discard
+    record_every : int
+        Recording stride after the transient
+    """
+
+    def __init__(self, initial_state, n_steps, transient=0, record_every=1):
+        self.initial_state = np.asarray(initial_state, dtype=float)
+        self.n_steps = n_steps
+        self.transient = transient
+        self.record_every = record_every
+
+    def __call__(self, params):
+        return iterate_memristive_fhn(self.initial_state, params, self.n_steps,
+                                      self.transient, record_every=self.record_every)
+
+
+class OdeRun:
+    """
+    ODE run: odeint(rhs, initial_state, t, args=(params,))
+
+    The model's analytic Jacobian is passed when one is registered in
+    utils.JACOBIANS.
+
+    Works with any RHS taking (state, t, params), such as
+    coupled_fhn_static and coupled_fhn_plastic.
+
+    Parameters:
+    -----------
+    rhs : callable
+        Right-hand side rhs(state, t, params)
+    initial_state : array
+        Initial state
+    t : array
+        Output time grid
+    events : list, optional
+        integrators.ThresholdEvent objects; the run then goes through
+        odeint_events, may stop early at a terminal event (e.g. M >=
+        0.95), and returns (solution, logs)
+    """
+
+    def __init__(self, rhs, initial_state, t, events=None):
+        self.rhs = rhs
+        self.initial_state = np.asarray(initial_state, dtype=float)
+        self.t = np.asarray(t, dtype=float)
+        self.events = events
+
+    def __call__(self, params):
+        if self.events is not None:
+            return odeint_events(self.rhs, self.initial_state, self.t, self.events,
+                                 args=(params,))
+        return integrate_ode(self.rhs, self.initial_state, self.t, args=(params,))
+
+
+def final_state(result):
+    """Reduction: last row of a trajectory / solution"""
+    if isinstance(result, tuple):
+        result = result[0]
+    return result[-1]
+
+
+def first_event_times(result):
+    """
+    Reduction for OdeRun with events: final state and first event times
+
+    Returns:
+    --------
+    summary : dict
+        'final_state' plus, for each event, the time of its first
+        crossing (NaN if it never fired)
+    """
+    solution, logs = result
+    summary = {'final_state': solution[-1]}
+    for name, log in logs.items():
+        summary[name] = log.times[0] if log.count else np.nan
+    return summary
+
+
+# ============================================================================
+# SWEEP RUNNER
+# ============================================================================
+
+def _run_chunk(task, reduce, start, params_chunk):
+    results = []
+    for params in params_chunk:
+        result = task(params)
+        results.append(reduce(result) if reduce is not None else result)
+    return start, results
+
+
+def run_sweep(task, grid, reduce=None, n_workers=None, chunk_size=None,
+              progress=None):
+    """
+    Run task(params) for every point of a parameter grid
+
+    The grid is split into chunks that are fanned out over a process
+    pool. Results come back in grid order regardless of which worker
+    finishes first. In a script, call this under
+    if __name__ == '__main__': so the workers can be spawned safely.
+
+    Parameters:
+    -----------
+    task : callable
+        task(params) -> result, e.g. MapRun or OdeRun (must be picklable)
+    grid : list of dict
+        Parameter dicts, e.g. from parameter_grid
+    reduce : callable, optional
+        Applied to each result inside the worker (e.g. final_state), so
+        only the reduced value is sent back
+    n_workers : int, optional
+        Number of processes (default: os.cpu_count()); 1 runs serially
+        in this process without a pool
+    chunk_size : int, optional
+        Grid points per job (default: about 4 jobs per worker)
+    progress : callable, optional
+        Called as progress(n_done, n_total) after each finished chunk
+
+    Returns:
+    --------
+    results : list
+        One (reduced) result per grid point, in grid order
+    """
+    n_total = len(grid)
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    n_workers = max(1, min(n_workers, n_total))
+    if chunk_size is None:
+        chunk_size = max(1, -(-n_total // (4 * n_workers)))
+
+    starts = range(0, n_total, chunk_size)
+    results = [None] * n_total
+    n_done = 0
+
+    if n_workers == 1:
+        for start in starts:
+            _, chunk_results = _run_chunk(task, reduce, start, grid[start:start + chunk_size])
+            results[start:start + len(chunk_results)] = chunk_results
+            n_done += len(chunk_results)
+            if progress is not None:
+                progress(n_done, n_total)
+        return results
+
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        futures = [pool.submit(_run_chunk, task, reduce, start,
+                               grid[start:start + chunk_size])
+                   for start in starts]
+        for future in as_completed(futures):
+            start, chunk_results = future.result()
+            results[start:start + len(chunk_results)] = chunk_results
+            n_done += len(chunk_results)
+            if progress is not None:
+                progress(n_done, n_total)
+
+    return results
+
+
+def print_progress(n_done, n_total):
+    """Simple progress callback for run_sweep"""
+    print(f"  Progress: {n_done}/{n_total} runs complete")
+
+
+# ============================================================================
+# TILED PARAMETER-PLANE SCANS
+# ============================================================================
+# A dense 2D scan (e.g. 1000 x 1000 cells of the (theta, k1) plane) is
+# split into tiles that are classified in worker processes. Results go to
+# memory-mapped .npy files in out_dir together with a per-tile "done"
+# mask, so an interrupted scan picks up at the first unfinished tile.
+
+SCAN_ARRAYS = {'kind': np.int8, 'period': np.int16, 'lyapunov': np.float64}
+
+
+def _scan_tile(base_params, x_name, x_values, y_name, y_values, initial_state,
+               classify_kwargs, tile):
+    kind, period, lyapunov = classify_orbit_grid(base_params, x_name, x_values,
+                                                 y_name, y_values, initial_state,
+                                                 **classify_kwargs)
+    return tile, {'kind': kind, 'period': period, 'lyapunov': lyapunov}
+
+
+def _to_builtin(obj):
+    """json.dumps fallback: NumPy scalars and arrays as Python builtins"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Cannot store {type(obj).__name__} in scan.json")
+
+
+def _scan_meta(base_params, x_name, x_values, y_name, y_values, initial_state, tile_shape,
+               classify_kwargs):
+    """
+    Scan settings as written to scan.json
+
+    Normalised through a JSON round trip (tuples become lists, NumPy
+    scalars become numbers), so a resumed scan compares equal to the
+    file it wrote.
+    """
+    meta = {
+        'base_params': {key: float(value) for key, value in base_params.items()
+                        if key not in (x_name, y_name)},
+        'x_name': x_name, 'x_values': x_values,
+        'y_name': y_name, 'y_values': y_values,
+        'initial_state': np.asarray(initial_state, dtype=float),
+        'tile_shape': tile_shape,
+        'classify_kwargs': classify_kwargs,
+    }
+    return json.loads(json.dumps(meta, default=_to_builtin))
+
+
+def _open_scan(out_dir, meta, shape, tiles_shape):
+    """Create the scan files, or reopen them if they belong to the same scan"""
+    meta_path = os.path.join(out_dir, 'scan.json')
+    mode = 'w+'
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            if json.load(f) != meta:
+                raise ValueError(f"{out_dir} holds a different scan; use another out_dir")
+        mode = 'r+'
+    else:
+        os.makedirs(out_dir, exist_ok=True)
+
+    arrays = {name: np.lib.format.open_memmap(os.path.join(out_dir, name + '.npy'), mode=mode,
+                                              dtype=dtype, shape=shape)
+              for name, dtype in SCAN_ARRAYS.items()}
+    done = np.lib.format.open_memmap(os.path.join(out_dir, 'tiles_done.npy'), mode=mode,
+                                     dtype=bool, shape=tiles_shape)
+
+    if mode == 'w+':
+        # Metadata last: its presence means the arrays exist
+        with open(meta_path, 'w') as f:
+            json.dump(meta, f, indent=1)
+    return arrays, done
+
+
+def scan_parameter_plane(base_params, x_name, x_values, y_name, y_values, out_dir,
+                         initial_state=(0.01, 0.02, 0.1), tile_shape=(100, 100),
+                         n_workers=None, progress=None, **classify_kwargs):
+    """
+    Orbit type and Lyapunov exponent over a dense 2D parameter plane
+
+    Every cell is classified with orbits.classify_orbits. Tiles of
+    tile_shape cells are fanned out over a process pool and written to
+    memory-mapped arrays in out_dir as they finish; calling this again
+    with the same arguments skips the tiles already done. In a script,
+    call this under if __name__ == '__main__':.
+
+    Parameters:
+    -----------
+    base_params : dict
+        Fixed map parameters
+    x_name, y_name : str
+        Swept parameter names (e.g. 'theta', 'k1')
+    x_values, y_values : array
+        Values along each axis (x along columns, y along rows)
+    out_dir : str
+        Directory for kind.npy, period.npy, lyapunov.npy, tiles_done.npy
+        and scan.json
+    initial_state : array, shape (3,)
+        Initial [x, y, z] for every cell
+    tile_shape : tuple
+        (rows, columns) per tile
+    n_workers : int, optional
+        Number of processes (default: os.cpu_count()); 1 runs serially
+    progress : callable, optional
+        Called as progress(n_done, n_total) with tile counts
+    **classify_kwargs
+        Passed to classify_orbits (transient, window, n_lyapunov, ...)
+
+    Returns:
+    --------
+    result : dict
+        Read-only memory maps 'kind', 'period' and 'lyapunov', each of
+        shape (len(y_values), len(x_values)); see orbits.classify_orbits
+    """
+    x_values = np.asarray(x_values, dtype=float)
+    y_values = np.asarray(y_values, dtype=float)
+    shape = (len(y_values), len(x_values))
+    th, tw = tile_shape
+    tiles_shape = (-(-shape[0] // th), -(-shape[1] // tw))
+
+    meta = _scan_meta(base_params, x_name, x_values, y_name, y_values, initial_state,
+                      (th, tw), classify_kwargs)
+    arrays, done = _open_scan(out_dir, meta, shape, tiles_shape)
+
+    todo = [(i, j) for i in range(tiles_shape[0]) for j in range(tiles_shape[1])
+            if not done[i, j]]
+    n_total = done.size
+    n_done = n_total - len(todo)
+
+    def jobs():
+        for i, j in todo:
+            rows = slice(i * th, (i + 1) * th)
+            cols = slice(j * tw, (j + 1) * tw)
+            yield (base_params, x_name, x_values[cols], y_name, y_values[rows],
+                   initial_state, classify_kwargs, (i, j))
+
+    def store(tile, result):
+        i, j = tile
+        for name, value in result.items():
+            arrays[name][i * th:(i + 1) * th, j * tw:(j + 1) * tw] = value
+            arrays[name].flush()
+        # Mark the tile only once its data is on disk
+        done[i, j] = True
+        done.flush()
+
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    n_workers = max(1, min(n_workers, len(todo)))
+
+    if n_workers == 1:
+        for job in jobs():
+            store(*_scan_tile(*job))
+            n_done += 1
+            if progress is not None:
+                progress(n_done, n_total)
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = [pool.submit(_scan_tile, *job) for job in jobs()]
+            for future in as_completed(futures):
+                store(*future.result())
+                n_done += 1
+                if progress is not None:
+                    progress(n_done, n_total)
+
+    del arrays, done
+    return {name: np.load(os.path.join(out_dir, name + '.npy'), mmap_mode='r')
+            for name in SCAN_ARRAYS}
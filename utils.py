@@ -7,6 +7,7 @@ import numpy as np
 from scipy.integrate import odeint
 import matplotlib.pyplot as plt
 from config import VIZ_PARAMS
+from synchrony import phase_difference as hilbert_phase_difference
 
 
 # ============================================================================
@@ -41,6 +42,22 @@ def fitzhugh_nagumo_ode(state, t, a, b, tau, I_ext):
     return [dv_dt, dw_dt]
 
 
+def fitzhugh_nagumo_jacobian(state, t, a, b, tau, I_ext):
+    """
+    Jacobian of fitzhugh_nagumo_ode (Dfun for odeint, same arguments)
+    
+    Returns:
+    --------
+    J : array, shape (2, 2)
+        J[i, j] = d(derivatives)_i / d(state)_j
+    """
+    v, w = state
+    return np.array([
+        [1 - v**2,  -1.0],
+        [1.0 / tau, -b / tau],
+    ])
+
+
 def fhn_nullclines(v_range, a, b, I_ext):
     """
     Calculate FHN nullclines for phase plane analysis
@@ -110,6 +127,402 @@ def coupled_fhn_static(state, t, params):
     return [dv1_dt, dw1_dt, dv2_dt, dw2_dt]
 
 
+def coupled_fhn_static_jacobian(state, t, params):
+    """
+    Jacobian of coupled_fhn_static (Dfun for odeint, same arguments)
+    
+    Returns:
+    --------
+    J : array, shape (4, 4)
+        J[i, j] = d(derivatives)_i / d(state)_j
+    """
+    v1, w1, v2, w2 = state
+    b, tau, g = params['b'], params['tau'], params['g']
+    return np.array([
+        [1 - v1**2, -1.0,     0.0,            0.0],
+        [1.0 / tau, -b / tau, 0.0,            0.0],
+        [g,         0.0,      1 - v2**2 - g,  -1.0],
+        [0.0,       0.0,      1.0 / tau,      -b / tau],
+    ])
+
+
+def coupled_fhn_plastic(state, t, params):
+    """
+    Two FHN neurons with PLASTIC (adaptive) coupling
+    
+    Parameters:
+    -----------
+    state : array, shape (5,)
+        [v1, w1, v2, w2, M] where M is the synaptic weight
+    t : float
+        Time
+    params : dict
+        Must contain: 'a', 'b', 'tau', 'I_ext', 'alpha' (learning rate),
+        'beta' (forgetting rate)
+    
+    Returns:
+    --------
+    derivatives : array, shape (5,)
+    """
+    v1, w1, v2, w2, M = state
+    a = params['a']
+    b = params['b']
+    tau = params['tau']
+    I_ext = params['I_ext']
+    alpha = params['alpha']
+    beta = params['beta']
+    
+    # Teacher neuron (receives external input)
+    dv1_dt = v1 - (v1**3)/3 - w1 + I_ext
+    dw1_dt = (v1 + a - b*w1) / tau
+    
+    # Student neuron (receives adaptive coupling from teacher)
+    delta_v = v1 - v2
+    I_syn = M * delta_v
+    dv2_dt = v2 - (v2**3)/3 - w2 + I_syn
+    dw2_dt = (v2 + a - b*w2) / tau
+    
+    # Hebbian plasticity rule
+    dM_dt = alpha * (delta_v**2) * (1 - M) - beta * M
+    
+    return [dv1_dt, dw1_dt, dv2_dt, dw2_dt, dM_dt]
+
+
+def coupled_fhn_plastic_jacobian(state, t, params):
+    """
+    Jacobian of coupled_fhn_plastic (Dfun for odeint, same arguments)
+    
+    Returns:
+    --------
+    J : array, shape (5, 5)
+        J[i, j] = d(derivatives)_i / d(state)_j
+    """
+    v1, w1, v2, w2, M = state
+    b, tau = params['b'], params['tau']
+    alpha, beta = params['alpha'], params['beta']
+    delta_v = v1 - v2
+    dM_dv = 2 * alpha * delta_v * (1 - M)
+    return np.array([
+        [1 - v1**2, -1.0,     0.0,            0.0,      0.0],
+        [1.0 / tau, -b / tau, 0.0,            0.0,      0.0],
+        [M,         0.0,      1 - v2**2 - M,  -1.0,     delta_v],
+        [0.0,       0.0,      1.0 / tau,      -b / tau, 0.0],
+        [dM_dv,     0.0,      -dM_dv,         0.0,      -alpha * delta_v**2 - beta],
+    ])
+
+
+def plastic_noise_diffusion(state, t, params):
+    """
+    Noise amplitude for the plastic model driven by voltage noise
+    
+    dv1 and dv2 receive independent white noise of strength
+    params['noise_strength']; w1, w2 and M are noise-free.
+    
+    Parameters:
+    -----------
+    state : array, shape (5,) or (5, n_paths)
+        [v1, w1, v2, w2, M]
+    t : float
+        Time
+    params : dict
+        Must contain: 'noise_strength'
+    
+    Returns:
+    --------
+    sigma : array, shape (5,) or (5, 1)
+        Broadcastable against state
+    """
+    sigma = params['noise_strength']
+    amplitude = np.array([sigma, 0.0, sigma, 0.0, 0.0])
+    return amplitude.reshape((5,) + (1,) * (np.ndim(state) - 1))
+
+
+def _additive_noise_derivative(state, t, params):
+    """d sigma_i / d y_i for state-independent noise (no Milstein correction)"""
+    return 0.0
+
+
+def simulate_plastic_with_noise(initial_state, t, params, noise_strength,
+                                n_trials=None, seed=None, method='euler_maruyama',
+                                substeps=1):
+    """
+    Stochastic plastic coupling model integrated as a proper SDE
+    
+    dv_i = f_i dt + sigma dW_i (Euler-Maruyama or Milstein), instead of
+    calling np.random.normal inside an odeint right-hand side. All
+    trials are integrated together from seeded noise streams.
+    
+    Parameters:
+    -----------
+    initial_state : array, shape (5,)
+        [v1, w1, v2, w2, M]
+    t : array
+        Output time points (the step is their spacing / substeps)
+    params : dict
+        Must contain: 'a', 'b', 'tau', 'I_ext', 'alpha', 'beta'
+    noise_strength : float
+        Noise amplitude sigma on v1 and v2
+    n_trials : int, optional
+        Number of independent noise realisations (None for one)
+    seed : int, optional
+        Seed for reproducible noise
+    method : str
+        'euler_maruyama' or 'milstein'
+    substeps : int
+        Integration steps per output interval
+    
+    Returns:
+    --------
+    solution : array, shape (len(t), n_trials, 5) or (len(t), 5)
+    """
+    from integrators import sdeint
+    
+    sde_params = dict(params, noise_strength=noise_strength)
+    return sdeint(coupled_fhn_plastic, plastic_noise_diffusion, initial_state, t,
+                  args=(sde_params,), method=method, n_paths=n_trials, seed=seed,
+                  substeps=substeps, diffusion_deriv=_additive_noise_derivative)
+
+
+# ============================================================================
+# ENSEMBLES OF COUPLED NEURONS (batched right-hand sides)
+# ============================================================================
+# N independent teacher/student pairs are stacked into one state vector
+# [v1, w1, v2, w2(, M)] * N, so a single odeint call integrates the whole
+# ensemble with one Python callback per RHS evaluation. Every parameter
+# may be a scalar or an array of shape (N,).
+
+def _ensemble_size(params, keys):
+    return max(np.size(params[key]) for key in keys)
+
+
+def coupled_fhn_static_batch(state, t, params):
+    """
+    Vectorized coupled_fhn_static for N stacked teacher/student pairs
+    
+    Parameters:
+    -----------
+    state : array, shape (N*4,)
+        Stacked [v1, w1, v2, w2] for each pair
+    t : float
+        Time
+    params : dict
+        'a', 'b', 'tau', 'I_ext', 'g'; scalars or arrays of shape (N,)
+    
+    Returns:
+    --------
+    derivatives : array, shape (N*4,)
+    """
+    s = np.reshape(state, (-1, 4))
+    v1, w1, v2, w2 = s[:, 0], s[:, 1], s[:, 2], s[:, 3]
+    a, b, tau = params['a'], params['b'], params['tau']
+    
+    d = np.empty_like(s)
+    d[:, 0] = v1 - (v1**3)/3 - w1 + params['I_ext']
+    d[:, 1] = (v1 + a - b*w1) / tau
+    d[:, 2] = v2 - (v2**3)/3 - w2 + params['g'] * (v1 - v2)
+    d[:, 3] = (v2 + a - b*w2) / tau
+    return d.ravel()
+
+
+def coupled_fhn_plastic_batch(state, t, params):
+    """
+    Vectorized coupled_fhn_plastic for N stacked teacher/student pairs
+    
+    Parameters:
+    -----------
+    state : array, shape (N*5,)
+        Stacked [v1, w1, v2, w2, M] for each pair
+    t : float
+        Time
+    params : dict
+        'a', 'b', 'tau', 'I_ext', 'alpha', 'beta'; scalars or arrays of
+        shape (N,)
+    
+    Returns:
+    --------
+    derivatives : array, shape (N*5,)
+    """
+    s = np.reshape(state, (-1, 5))
+    v1, w1, v2, w2, M = s[:, 0], s[:, 1], s[:, 2], s[:, 3], s[:, 4]
+    a, b, tau = params['a'], params['b'], params['tau']
+    delta_v = v1 - v2
+    
+    d = np.empty_like(s)
+    d[:, 0] = v1 - (v1**3)/3 - w1 + params['I_ext']
+    d[:, 1] = (v1 + a - b*w1) / tau
+    d[:, 2] = v2 - (v2**3)/3 - w2 + M * delta_v
+    d[:, 3] = (v2 + a - b*w2) / tau
+    d[:, 4] = params['alpha'] * (delta_v**2) * (1 - M) - params['beta'] * M
+    return d.ravel()
+
+
+def _banded_from_blocks(blocks):
+    """
+    Block-diagonal Jacobian in odeint's banded storage
+    
+    blocks has shape (N, d, d); the result has shape (2d - 1, N*d) with
+    band[i - j + (d-1), j] = J[i, j], i.e. ml = mu = d - 1.
+    """
+    n, d, _ = blocks.shape
+    band = np.zeros((2*d - 1, n*d))
+    r, c = np.indices((d, d))
+    band[r - c + d - 1, np.arange(n)[:, None, None] * d + c] = blocks
+    return band
+
+
+def coupled_fhn_static_batch_jacobian(state, t, params):
+    """
+    Banded Jacobian of coupled_fhn_static_batch (use with ml = mu = 3)
+    
+    Returns:
+    --------
+    band : array, shape (7, N*4)
+        Bands of the block-diagonal Jacobian, see _banded_from_blocks
+    """
+    s = np.reshape(state, (-1, 4))
+    v1, v2 = s[:, 0], s[:, 2]
+    b, tau, g = params['b'], params['tau'], params['g']
+    
+    J = np.zeros((len(s), 4, 4))
+    J[:, 0, 0] = 1 - v1**2
+    J[:, 0, 1] = -1.0
+    J[:, 1, 0] = 1.0 / tau
+    J[:, 1, 1] = -b / tau
+    J[:, 2, 0] = g
+    J[:, 2, 2] = 1 - v2**2 - g
+    J[:, 2, 3] = -1.0
+    J[:, 3, 2] = 1.0 / tau
+    J[:, 3, 3] = -b / tau
+    return _banded_from_blocks(J)
+
+
+def coupled_fhn_plastic_batch_jacobian(state, t, params):
+    """
+    Banded Jacobian of coupled_fhn_plastic_batch (use with ml = mu = 4)
+    
+    Returns:
+    --------
+    band : array, shape (9, N*5)
+        Bands of the block-diagonal Jacobian, see _banded_from_blocks
+    """
+    s = np.reshape(state, (-1, 5))
+    v1, v2, M = s[:, 0], s[:, 2], s[:, 4]
+    b, tau = params['b'], params['tau']
+    alpha, beta = params['alpha'], params['beta']
+    delta_v = v1 - v2
+    dM_dv = 2 * alpha * delta_v * (1 - M)
+    
+    J = np.zeros((len(s), 5, 5))
+    J[:, 0, 0] = 1 - v1**2
+    J[:, 0, 1] = -1.0
+    J[:, 1, 0] = 1.0 / tau
+    J[:, 1, 1] = -b / tau
+    J[:, 2, 0] = M
+    J[:, 2, 2] = 1 - v2**2 - M
+    J[:, 2, 3] = -1.0
+    J[:, 2, 4] = delta_v
+    J[:, 3, 2] = 1.0 / tau
+    J[:, 3, 3] = -b / tau
+    J[:, 4, 0] = dM_dv
+    J[:, 4, 2] = -dM_dv
+    J[:, 4, 4] = -alpha * delta_v**2 - beta
+    return _banded_from_blocks(J)
+
+
+# Batched RHS -> (state size per pair, parameter keys)
+ENSEMBLE_MODELS = {
+    coupled_fhn_static_batch: (4, ('a', 'b', 'tau', 'I_ext', 'g')),
+    coupled_fhn_plastic_batch: (5, ('a', 'b', 'tau', 'I_ext', 'alpha', 'beta')),
+}
+
+# RHS -> (analytic Jacobian, (ml, mu) for banded storage or None for dense)
+JACOBIANS = {
+    fitzhugh_nagumo_ode: (fitzhugh_nagumo_jacobian, None),
+    coupled_fhn_static: (coupled_fhn_static_jacobian, None),
+    coupled_fhn_plastic: (coupled_fhn_plastic_jacobian, None),
+    coupled_fhn_static_batch: (coupled_fhn_static_batch_jacobian, (3, 3)),
+    coupled_fhn_plastic_batch: (coupled_fhn_plastic_batch_jacobian, (4, 4)),
+}
+
+
+def jacobian_kwargs(rhs):
+    """
+    odeint keyword arguments (Dfun, plus ml/mu if banded) for a known RHS
+    
+    Returns an empty dict for right-hand sides without an analytic
+    Jacobian, so odeint falls back to finite differences.
+    """
+    if rhs not in JACOBIANS:
+        return {}
+    jac, band = JACOBIANS[rhs]
+    if band is None:
+        return {'Dfun': jac}
+    return {'Dfun': jac, 'ml': band[0], 'mu': band[1]}
+
+
+def integrate_ode(rhs, initial_state, t, args=(), **odeint_kwargs):
+    """
+    odeint with the model's analytic Jacobian passed automatically
+    
+    Parameters:
+    -----------
+    rhs : callable
+        Right-hand side, e.g. coupled_fhn_plastic
+    initial_state : array
+        Initial state
+    t : array
+        Output time grid
+    args : tuple
+        Extra arguments for rhs, e.g. (params,)
+    **odeint_kwargs
+        Passed on to odeint; an explicit Dfun overrides the lookup
+    
+    Returns:
+    --------
+    solution : array, shape (len(t), len(initial_state))
+        (plus infodict if full_output=True)
+    """
+    kwargs = dict(jacobian_kwargs(rhs), **odeint_kwargs)
+    return odeint(rhs, initial_state, t, args=args, **kwargs)
+
+
+def simulate_ensemble(rhs_batch, initial_state, t, params, **odeint_kwargs):
+    """
+    Integrate a whole parameter ensemble with a single odeint call
+    
+    The ensemble size N is taken from the array-valued parameters (or
+    from a stacked initial state). All members share one adaptive step
+    sequence, so results agree with separate runs to solver tolerance.
+    
+    Parameters:
+    -----------
+    rhs_batch : callable
+        coupled_fhn_static_batch or coupled_fhn_plastic_batch
+    initial_state : array, shape (dim,) or (N, dim)
+        Initial state, shared by all members or one row per member
+    t : array
+        Output time grid
+    params : dict
+        Parameters; scalars or arrays of shape (N,)
+    **odeint_kwargs
+        Passed on to odeint (e.g. rtol, atol); the banded analytic
+        Jacobian is used unless Dfun is given
+    
+    Returns:
+    --------
+    solution : array, shape (len(t), N, dim)
+    """
+    dim, keys = ENSEMBLE_MODELS[rhs_batch]
+    initial_state = np.asarray(initial_state, dtype=float)
+    n = _ensemble_size(params, keys)
+    if initial_state.ndim == 2:
+        n = max(n, len(initial_state))
+    
+    y0 = np.broadcast_to(initial_state, (n, dim)).ravel()
+    sol = integrate_ode(rhs_batch, y0, t, args=(params,), **odeint_kwargs)
+    return sol.reshape(len(t), n, dim)
+
+
 # ============================================================================
 # DISCRETE MEMRISTOR (from Shatnawi et al. 2023)
 # ============================================================================
@@ -160,6 +573,13 @@ def discrete_memristor_current(x_n, v_n):
 # MEMRISTIVE FHN SYSTEM (Discrete-time)
 # ============================================================================
 
+# States beyond this magnitude are treated as diverged
+MAX_VAL = 1e10
+
+# Parameter keys of the 3D memristive FHN map
+MAP_PARAM_KEYS = ('gamma', 'theta', 'delta', 'I_ext', 'k1', 'k2')
+
+
 def memristive_fhn_map(state, params):
     """
     3D discrete memristive FHN neuron map (Shatnawi et al. 2023, Eq. 12)
@@ -189,7 +609,6 @@ def memristive_fhn_map(state, params):
     k2 = params['k2']
     
     # Clamp values to prevent overflow (divergence detection)
-    MAX_VAL = 1e10
     if abs(x) > MAX_VAL or abs(y) > MAX_VAL or abs(z) > MAX_VAL:
         return np.array([np.nan, np.nan, np.nan])
     
@@ -205,7 +624,157 @@ def memristive_fhn_map(state, params):
     return np.array([x_next, y_next, z_next])
 
 
-def iterate_memristive_fhn(initial_state, params, n_steps, transient=0):
+def memristive_fhn_jacobian(state, params):
+    """
+    Jacobian of the memristive FHN map at a state
+    
+    Parameters:
+    -----------
+    state : array, shape (3,)
+        [x, y, z]
+    params : dict
+        Must contain: 'gamma', 'theta', 'k1', 'k2'
+    
+    Returns:
+    --------
+    J : array, shape (3, 3)
+        J[i, j] = d(next_state)_i / d(state)_j
+    """
+    x, y, z = state
+    k1 = params['k1']
+    return np.array([
+        [1 - x**2 + k1 * z, -1.0,            k1 * x],
+        [params['theta'],   params['gamma'], 0.0],
+        [-params['k2'],     0.0,             1 + np.cos(z)],
+    ])
+
+
+def memristive_fhn_jacobian_batch(states, params):
+    """
+    Jacobians of the memristive FHN map at N states
+    
+    Parameters:
+    -----------
+    states : array, shape (N, 3)
+        Current [x, y, z] for each trajectory
+    params : dict
+        'gamma', 'theta', 'k1', 'k2'; scalars or arrays of shape (N,)
+    
+    Returns:
+    --------
+    J : array, shape (N, 3, 3)
+    """
+    x = states[:, 0]
+    z = states[:, 2]
+    J = np.zeros((len(states), 3, 3))
+    J[:, 0, 0] = 1 - x**2 + params['k1'] * z
+    J[:, 0, 1] = -1.0
+    J[:, 0, 2] = params['k1'] * x
+    J[:, 1, 0] = params['theta']
+    J[:, 1, 1] = params['gamma']
+    J[:, 2, 0] = -np.asarray(params['k2'])
+    J[:, 2, 2] = 1 + np.cos(z)
+    return J
+
+
+# Early-exit criteria for the *_until map iterators and the status codes
+# they report: 0 = ran all steps, -1 = diverged, p >= 1 = settled on a
+# period-p orbit (1 = fixed point)
+STOP_CRITERIA = ('diverged', 'fixed_point', 'cycle')
+STATUS_COMPLETED = 0
+STATUS_DIVERGED = -1
+
+
+def _check_stop_on(stop_on):
+    unknown = set(stop_on) - set(STOP_CRITERIA)
+    if unknown:
+        raise ValueError(f"Unknown stop criteria {sorted(unknown)}, expected {STOP_CRITERIA}")
+
+
+def _state_hash(states, tol):
+    """
+    Integer hash of states quantized to a grid of spacing tol
+    
+    Used as a rolling hash over the last few states to spot repeats
+    cheaply; candidate matches are then verified with the exact tolerance.
+    """
+    q = np.clip(np.round(states / tol), -2.0**62, 2.0**62).astype(np.int64)
+    return (q[:, 0] * np.int64(73856093)) ^ (q[:, 1] * np.int64(19349663)) ^ (q[:, 2] * np.int64(83492791))
+
+
+def _cycle_lags(stop_on, max_period):
+    """
+    Lags checked for repeats
+    
+    Every lag from 1 is checked whenever orbits are detected at all, so
+    the smallest matching lag is the true period (a fixed point also
+    repeats after 2 steps, but is never reported as a 2-cycle).
+    """
+    if 'fixed_point' in stop_on or 'cycle' in stop_on:
+        return np.arange(1, max_period + 1)
+    return np.arange(0)
+
+
+def _period_stops(period, stop_on):
+    """Whether settling on a period-p orbit ends the iteration"""
+    return np.where(period == 1, 'fixed_point' in stop_on, 'cycle' in stop_on)
+
+
+def _periodic_fill(ring, stop_step, period, steps):
+    """
+    States of a period-p orbit at later steps, from the ring buffer
+    
+    ring[k % P] holds the state after step k for the last P steps up to
+    stop_step, and state(k) = state(k - p * ceil((k - stop_step) / p)).
+    """
+    P = ring.shape[-2]
+    source = steps - period * np.ceil((steps - stop_step) / period).astype(int)
+    return ring[..., source % P, :]
+
+
+# RAM used to stage blocks of trajectory data before they are written to
+# a preallocated (e.g. memory-mapped) output array
+WRITE_BUFFER_BYTES = 64 * 2**20
+
+
+def block_length(item_bytes):
+    """Number of items of item_bytes each that fit in WRITE_BUFFER_BYTES (>= 1)"""
+    return max(1, int(WRITE_BUFFER_BYTES // max(item_bytes, 1)))
+
+
+def n_recorded_steps(n_steps, transient=0, record_every=1):
+    """
+    Number of states kept by iterate_memristive_fhn
+    
+    Parameters:
+    -----------
+    n_steps : int
+        Number of iterations
+    transient : int
+        Number of initial steps to discard
+    record_every : int
+        Keep one state every record_every steps after the transient
+    
+    Returns:
+    --------
+    n_recorded : int
+    """
+    return len(range(transient, n_steps, record_every))
+
+
+def _trajectory_buffer(n_steps, transient, record_every, out):
+    if record_every < 1:
+        raise ValueError(f"record_every must be >= 1, got {record_every}")
+    n_recorded = n_recorded_steps(n_steps, transient, record_every)
+    if out is None:
+        return np.empty((n_recorded, 3))
+    if out.shape != (n_recorded, 3):
+        raise ValueError(f"out has shape {out.shape}, expected {(n_recorded, 3)}")
+    return out
+
+
+def iterate_memristive_fhn(initial_state, params, n_steps, transient=0,
+                           record_every=1, out=None):
     """
     Iterate the memristive FHN map
     
@@ -219,21 +788,368 @@ def iterate_memristive_fhn(initial_state, params, n_steps, transient=0):
         Number of iterations
     transient : int
         Number of initial steps to discard
+    record_every : int
+        Keep one state every record_every steps after the transient
+        (1 keeps every state)
+    out : array, shape (n_recorded, 3), optional
+        Preallocated buffer to write the trajectory into, where
+        n_recorded = n_recorded_steps(n_steps, transient, record_every)
+    
+    Returns:
+    --------
+    trajectory : array, shape (n_recorded, 3)
+        System trajectory after transient (out, if it was given)
+    """
+    out = _trajectory_buffer(n_steps, transient, record_every, out)
+    state = np.array(initial_state, dtype=float)
+    j = 0
+    
+    for i in range(n_steps):
+        state = memristive_fhn_map(state, params)
+        if i >= transient and (i - transient) % record_every == 0:
+            out[j] = state
+            j += 1
+    
+    return out
+
+
+def iterate_memristive_fhn_until(initial_state, params, n_steps, transient=0,
+                                 record_every=1, out=None, stop_on=STOP_CRITERIA,
+                                 tol=1e-9, max_period=32):
+    """
+    Iterate the memristive FHN map, stopping early once the orbit is known
+    
+    Same as iterate_memristive_fhn, but the iteration ends when one of
+    the stop_on criteria is met. The rest of the trajectory is then
+    filled in (NaN, or by repeating the orbit), so the output has the
+    same shape as a full run.
+    
+    Parameters:
+    -----------
+    initial_state, params, n_steps, transient, record_every, out
+        As for iterate_memristive_fhn
+    stop_on : tuple of str
+        Early-exit criteria from STOP_CRITERIA: 'diverged' (state became
+        NaN), 'fixed_point' or 'cycle' (state repeats within tol after p
+        <= max_period steps; the smallest such p is the period)
+    tol : float
+        Tolerance for fixed points and cycles
+    max_period : int
+        Longest cycle that is detected
     
     Returns:
     --------
-    trajectory : array, shape (n_steps - transient, 3)
-        System trajectory after transient
+    trajectory : array, shape (n_recorded, 3)
+        System trajectory after transient (out, if it was given)
+    status : int
+        0 ran all steps, -1 diverged, p >= 1 settled on a period-p orbit
+        (1 = fixed point)
+    n_done : int
+        Number of iterations performed
     """
+    _check_stop_on(stop_on)
+    out = _trajectory_buffer(n_steps, transient, record_every, out)
+    n_recorded = len(out)
     state = np.array(initial_state, dtype=float)
-    trajectory = []
+    j = 0
+    
+    lags = _cycle_lags(stop_on, max_period)
+    P = max_period
+    ring = np.empty((P, 3))
+    ring_hash = np.zeros(P, dtype=np.int64)
+    status = STATUS_COMPLETED
+    n_done = n_steps
     
     for i in range(n_steps):
         state = memristive_fhn_map(state, params)
+        if i >= transient and (i - transient) % record_every == 0:
+            out[j] = state
+            j += 1
+        
+        if not np.all(np.isfinite(state)):
+            if 'diverged' in stop_on:
+                status = STATUS_DIVERGED
+                n_done = i + 1
+                out[j:] = np.nan
+                break
+            continue
+        
+        # Hash matches flag a repeat; the exact distances then give the
+        # period (states within tol can fall in different hash cells)
+        h = _state_hash(state[None, :], tol)[0]
+        period = 0
+        slots = (i - lags[lags <= i]) % P
+        if np.any(ring_hash[slots] == h):
+            matched = np.abs(ring[slots] - state).max(axis=1) <= tol
+            if matched.any():
+                period = int(lags[matched.argmax()])
+        
+        ring[i % P] = state
+        ring_hash[i % P] = h
+        if period and _period_stops(period, stop_on):
+            status = period
+            n_done = i + 1
+            steps = transient + np.arange(j, n_recorded) * record_every
+            out[j:] = _periodic_fill(ring, i, status, steps)
+            break
+    
+    return out, status, n_done
+
+
+def broadcast_map_params(params, n):
+    """
+    Broadcast the map parameters to float arrays of shape (n,)
+    
+    Each entry of params may be a scalar or an array of length n.
+    """
+    return {key: np.broadcast_to(np.asarray(params[key], dtype=float), (n,))
+            for key in MAP_PARAM_KEYS}
+
+
+def map_batch_size(initial_states, params):
+    """
+    Number of trajectories N in a batch of map runs
+    
+    The longest of the parameter arrays and, for an (N, 3) array of
+    initial states, N; scalars count as 1.
+    """
+    sizes = [np.size(params[key]) for key in MAP_PARAM_KEYS]
+    if np.ndim(initial_states) == 2:
+        sizes.append(len(initial_states))
+    return max(sizes)
+
+
+def broadcast_map_batch(initial_states, params):
+    """
+    Initial states and parameters of a batch of map runs, broadcast to N
+    
+    Parameters:
+    -----------
+    initial_states : array, shape (N, 3) or (3,)
+        Initial [x, y, z] for each trajectory (a single state is shared)
+    params : dict
+        Map parameters; each value is a scalar or an array of shape (N,)
+    
+    Returns:
+    --------
+    states : array, shape (N, 3)
+        Writable copy of the initial states
+    param_arrays : dict
+        Parameter arrays of shape (N,), see broadcast_map_params
+    """
+    n = map_batch_size(initial_states, params)
+    states = np.array(np.broadcast_to(np.asarray(initial_states, dtype=float), (n, 3)))
+    return states, broadcast_map_params(params, n)
+
+
+def memristive_fhn_map_batch(states, params):
+    """
+    Vectorized memristive FHN map applied to N states at once
+    
+    Same update as memristive_fhn_map, but every parameter may be given
+    per trajectory. Rows whose current state has left the MAX_VAL box
+    (or is already NaN) map to NaN, as in the scalar version.
+    
+    Parameters:
+    -----------
+    states : array, shape (N, 3)
+        Current [x, y, z] for each trajectory
+    params : dict
+        Must contain: 'gamma', 'theta', 'delta', 'I_ext', 'k1', 'k2'
+        Each value is a scalar or an array of shape (N,)
+    
+    Returns:
+    --------
+    next_states : array, shape (N, 3)
+    """
+    states = np.asarray(states, dtype=float)
+    x = states[:, 0]
+    y = states[:, 1]
+    z = states[:, 2]
+    
+    next_states = np.empty_like(states)
+    next_states[:, 0] = x - (x**3)/3 - y + params['I_ext'] + params['k1'] * z * x
+    next_states[:, 1] = params['gamma'] * y + params['theta'] * x + params['delta']
+    next_states[:, 2] = z + np.sin(z) - params['k2'] * x
+    
+    # Per-trajectory divergence mask (replaces the scalar MAX_VAL check)
+    diverged = ~(np.abs(states) <= MAX_VAL).all(axis=1)
+    next_states[diverged] = np.nan
+    
+    return next_states
+
+
+def iterate_memristive_fhn_batch(initial_states, params, n_steps, transient=0, out=None):
+    """
+    Iterate N independent copies of the memristive FHN map together
+    
+    All trajectories are advanced with NumPy array operations. A
+    trajectory that diverges is filled with NaN from that step on and is
+    dropped from the update, so it does not stop or slow down the rest.
+    
+    Parameters:
+    -----------
+    initial_states : array, shape (N, 3) or (3,)
+        Initial [x, y, z] for each trajectory (a single state is shared)
+    params : dict
+        Map parameters; each value is a scalar or an array of shape (N,)
+    n_steps : int
+        Number of iterations
+    transient : int
+        Number of initial steps to discard
+    out : array, shape (N, n_steps - transient, 3), optional
+        Preallocated buffer to write the trajectories into (e.g. a
+        memory-mapped dataset)
+    
+    Returns:
+    --------
+    trajectories : array, shape (N, n_steps - transient, 3)
+        Trajectories after transient (NaN once a trajectory diverges;
+        out, if it was given)
+    """
+    return _iterate_batch(initial_states, params, n_steps, transient, out, None, 0.0, 1)[0]
+
+
+def iterate_memristive_fhn_batch_until(initial_states, params, n_steps, transient=0,
+                                       out=None, stop_on=STOP_CRITERIA, tol=1e-9,
+                                       max_period=32):
+    """
+    Batched iterate_memristive_fhn_until
+    
+    Trajectories that meet a stop_on criterion are dropped from the
+    update; settled ones have their remaining states filled in by
+    repeating the orbit. Divergent trajectories are always NaN from the
+    step they diverge, but only get the diverged status when 'diverged'
+    is in stop_on (as in iterate_memristive_fhn_until).
+    
+    Parameters:
+    -----------
+    initial_states, params, n_steps, transient, out
+        As for iterate_memristive_fhn_batch
+    stop_on, tol, max_period
+        As for iterate_memristive_fhn_until
+    
+    Returns:
+    --------
+    trajectories : array, shape (N, n_steps - transient, 3)
+        Trajectories after transient (out, if it was given)
+    status : array of int, shape (N,)
+        Status code per trajectory (0 ran all steps, -1 diverged, p >= 1
+        settled on a period-p orbit)
+    n_done : array of int, shape (N,)
+        Iterations performed per trajectory
+    """
+    _check_stop_on(stop_on)
+    return _iterate_batch(initial_states, params, n_steps, transient, out,
+                          stop_on, tol, max_period)
+
+
+def _iterate_batch(initial_states, params, n_steps, transient, out, stop_on, tol, max_period):
+    """Shared loop of the batched iterators (stop_on None: no orbit checks)"""
+    state, param_arrays = broadcast_map_batch(initial_states, params)
+    n = len(state)
+    n_recorded = max(n_steps - transient, 0)
+    if out is None:
+        trajectories = np.empty((n, n_recorded, 3))
+        buffer = None
+    elif out.shape != (n, n_recorded, 3):
+        raise ValueError(f"out has shape {out.shape}, expected {(n, n_recorded, 3)}")
+    else:
+        # Steps are staged in RAM and written as (N, block, 3) slabs, so
+        # a memory-mapped out gets one contiguous run per row and block
+        # rather than a scattered column per step
+        trajectories = out
+        buffer = np.empty((n, min(n_recorded, block_length(n * 3 * 8)), 3))
+    n_filled = 0   # recorded steps computed
+    n_written = 0  # of which in trajectories
+    
+    live = np.arange(n)
+    live_params = param_arrays
+    
+    stopping = stop_on is not None
+    status = np.full(n, STATUS_COMPLETED)
+    n_done = np.full(n, n_steps)
+    if stopping:
+        lags = _cycle_lags(stop_on, max_period)
+        P = max_period
+        ring = np.empty((n, P, 3))
+        ring_hash = np.zeros((n, P), dtype=np.int64)
+        stop_step = np.full(n, -1)
+    
+    for i in range(n_steps):
+        if live.size == n:
+            state = memristive_fhn_map_batch(state, live_params)
+            live_state = state
+        elif live.size > 0:
+            live_state = memristive_fhn_map_batch(state[live], live_params)
+            state[live] = live_state
+        else:
+            break
+        lost = ~np.isfinite(live_state).all(axis=1)
+        
         if i >= transient:
-            trajectory.append(state.copy())
+            if buffer is None:
+                trajectories[:, n_filled] = state
+                n_written = n_filled + 1
+            else:
+                buffer[:, n_filled - n_written] = state
+                if n_filled + 1 - n_written == buffer.shape[1]:
+                    trajectories[:, n_written:n_filled + 1] = buffer
+                    n_written = n_filled + 1
+            n_filled += 1
+        
+        if stopping:
+            if 'diverged' in stop_on:
+                status[live[lost]] = STATUS_DIVERGED
+                n_done[live[lost]] = i + 1
+            
+            # Rolling-hash check for repeats; the exact distances over all
+            # lags then give the period
+            h = _state_hash(np.where(lost[:, None], 0.0, live_state), tol)
+            step_lags = lags[lags <= i]
+            if step_lags.size:
+                slots = (i - step_lags) % P
+                hits = ring_hash[live][:, slots] == h[:, None]
+                hits[lost] = False
+                rows = np.flatnonzero(hits.any(axis=1))
+                if rows.size:
+                    dist = np.abs(ring[live[rows]][:, slots] - live_state[rows, None, :]).max(axis=2)
+                    confirmed = dist <= tol
+                    found = confirmed.any(axis=1)
+                    period = step_lags[confirmed.argmax(axis=1)]
+                    settled = found & _period_stops(period, stop_on)
+                    rows = rows[settled]
+                    status[live[rows]] = period[settled]
+                    n_done[live[rows]] = i + 1
+                    stop_step[live[rows]] = i
+                    lost[rows] = True
+            
+            ring[live, i % P] = live_state
+            ring_hash[live, i % P] = h
+        
+        if lost.any():
+            live = live[~lost]
+            live_params = {key: value[live] for key, value in param_arrays.items()}
+    
+    # Steps still in the buffer, then the steps skipped once every row
+    # had stopped: NaN for diverged rows (settled ones are filled below)
+    if n_filled > n_written:
+        trajectories[:, n_written:n_filled] = buffer[:, :n_filled - n_written]
+    if n_filled < n_recorded:
+        for row in np.flatnonzero(status <= 0):
+            trajectories[row, n_filled:] = np.nan
+    
+    if not stopping:
+        return trajectories, status, n_done
     
-    return np.array(trajectory)
+    # Continue settled orbits over the steps that were skipped
+    for row in np.flatnonzero(status > 0):
+        first = max(stop_step[row] + 1, transient)
+        steps = np.arange(first, n_steps)
+        trajectories[row, first - transient:] = _periodic_fill(ring[row], stop_step[row],
+                                                               status[row], steps)
+    
+    return trajectories, status, n_done
 
 
 # ============================================================================
@@ -255,6 +1171,10 @@ def calculate_lyapunov_exponent(trajectory, max_iterations=5000):
     --------
     lyapunov : float
         Estimated largest Lyapunov exponent
+    
+    Note: this is only a rough separation-rate heuristic. For the
+    memristive FHN map, map_analysis.lyapunov_spectrum computes the
+    exponents from the map Jacobian.
     """
     n_points = min(len(trajectory), max_iterations)
     d0 = 1e-10  # Initial separation
@@ -282,11 +1202,10 @@ def phase_difference(v1, v2):
     Returns:
     --------
     phase_diff : array
-        Phase difference over time
+        Hilbert phase difference over time, wrapped to (-pi, pi]
+        (see synchrony.py for phase-locking measures)
     """
-    # Simple approach: use Hilbert transform or cross-correlation
-    # For now, use normalized difference
-    return v1 - v2
+    return hilbert_phase_difference(v1, v2)
 
 
 def synchronization_index(v1, v2):
@@ -307,6 +1226,131 @@ def synchronization_index(v1, v2):
     return abs(correlation)
 
 
+def rolling_correlation_batch(V1, V2, window, stride=1, rtol=1e-20):
+    """
+    Sliding-window Pearson correlation for many pairs of time series
+    
+    Window sums of x, y, x^2, y^2 and xy are differences of cumulative
+    sums, so the cost is one pass over the data whatever the window and
+    stride. Each series is centred on its global mean first to keep the
+    cumulative sums well conditioned. Windows whose variance is tiny next
+    to their offset from that mean lose most digits to cancellation;
+    those are recomputed centred on their own mean.
+    
+    Parameters:
+    -----------
+    V1, V2 : array, shape (n_pairs, n)
+        Time series, one pair per row
+    window : int
+        Window length in samples
+    stride : int
+        Step between window starts
+    rtol : float
+        A window counts as constant when its variance about its own mean
+        is at most rtol times its mean square: rounding leaves a residue
+        there instead of an exact zero
+    
+    Returns:
+    --------
+    corr : array, shape (n_pairs, n_windows)
+        Correlation in windows starting at 0, stride, 2*stride, ...
+        (NaN where a window is constant)
+    starts : array, shape (n_windows,)
+        Index of the first sample of each window
+    """
+    V1 = np.atleast_2d(np.asarray(V1, dtype=float))
+    V2 = np.atleast_2d(np.asarray(V2, dtype=float))
+    if window < 2 or stride < 1:
+        raise ValueError(f"Need window >= 2 and stride >= 1, got {window}, {stride}")
+    
+    n = V1.shape[-1]
+    starts = np.arange(0, n - window + 1, stride)
+    
+    x = V1 - V1.mean(axis=-1, keepdims=True)
+    y = V2 - V2.mean(axis=-1, keepdims=True)
+    
+    def window_sums(a):
+        c = np.zeros(a.shape[:-1] + (n + 1,))
+        np.cumsum(a, axis=-1, out=c[..., 1:])
+        return c[..., starts + window] - c[..., starts]
+    
+    sx, sy = window_sums(x), window_sums(y)
+    cov = window_sums(x * y) - sx * sy / window
+    sxx, syy = window_sums(x * x), window_sums(y * y)
+    var_x = sxx - sx**2 / window
+    var_y = syy - sy**2 / window
+    constant = np.zeros(var_x.shape, dtype=bool)
+    
+    # Fewer than ~10 digits left after cancellation: centre these windows
+    # on their own mean, a block of windows at a time
+    rows, cols = np.nonzero((var_x <= 1e-6 * sxx) | (var_y <= 1e-6 * syy))
+    block = max(1, 2**20 // window)
+    for b in range(0, len(rows), block):
+        r, c = rows[b:b + block], cols[b:b + block]
+        idx = starts[c, None] + np.arange(window)
+        a, w = V1[r[:, None], idx], V2[r[:, None], idx]
+        mean_a, mean_w = a.mean(axis=-1), w.mean(axis=-1)
+        a, w = a - mean_a[:, None], w - mean_w[:, None]
+        sa, sw = a.sum(axis=-1), w.sum(axis=-1)
+        cov[r, c] = (a * w).sum(axis=-1) - sa * sw / window
+        var_a = (a * a).sum(axis=-1) - sa**2 / window
+        var_w = (w * w).sum(axis=-1) - sw**2 / window
+        var_x[r, c], var_y[r, c] = var_a, var_w
+        # Mean square of the raw window: mean^2 + variance
+        constant[r, c] = ((var_a <= rtol * (window * mean_a**2 + var_a))
+                          | (var_w <= rtol * (window * mean_w**2 + var_w)))
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = cov / np.sqrt(var_x * var_y)
+    corr[constant] = np.nan
+    return np.clip(corr, -1.0, 1.0), starts
+
+
+def rolling_correlation(v1, v2, window, stride=1):
+    """
+    Sliding-window Pearson correlation of two time series
+    
+    Same values as np.corrcoef(v1[s:s+window], v2[s:s+window])[0, 1]
+    for every window start s, see rolling_correlation_batch.
+    
+    Parameters:
+    -----------
+    v1, v2 : array
+        Two time series
+    window : int
+        Window length in samples
+    stride : int
+        Step between window starts
+    
+    Returns:
+    --------
+    corr : array, shape (n_windows,)
+        Correlation per window
+    starts : array, shape (n_windows,)
+        Index of the first sample of each window
+    """
+    corr, starts = rolling_correlation_batch(np.asarray(v1)[None, :], np.asarray(v2)[None, :],
+                                             window, stride)
+    return corr[0], starts
+
+
+def rolling_synchronization_index(v1, v2, window, stride=1):
+    """
+    synchronization_index over sliding windows (|rolling correlation|)
+    
+    Inputs may also be (n_pairs, n) stacks, as for rolling_correlation_batch.
+    
+    Returns:
+    --------
+    sync : array, shape (n_windows,) or (n_pairs, n_windows)
+        Value between 0 (no sync) and 1 (perfect sync) per window
+    starts : array, shape (n_windows,)
+        Index of the first sample of each window
+    """
+    corr, starts = rolling_correlation_batch(v1, v2, window, stride)
+    return np.abs(corr if np.ndim(v1) > 1 else corr[0]), starts
+
+
 # ============================================================================
 # VISUALIZATION FUNCTIONS
 # ============================================================================
@@ -426,11 +1470,10 @@ def plot_bifurcation_diagram(param_values, trajectories, param_name='Parameter')
     """
     fig, ax = plt.subplots(figsize=VIZ_PARAMS['figsize'])
     
-    for i, param_val in enumerate(param_values):
-        traj = trajectories[i]
-        # Plot last portion of trajectory
-        x_vals = traj[:, 0]  # Membrane potential
-        param_array = np.full_like(x_vals, param_val)
+    # One plot call for all parameter values
+    if len(trajectories) > 0:
+        x_vals = np.concatenate([traj[:, 0] for traj in trajectories])  # Membrane potential
+        param_array = np.repeat(param_values, [len(traj) for traj in trajectories])
         ax.plot(param_array, x_vals, ',k', markersize=0.5, alpha=0.5)
     
     ax.set_xlabel(param_name)
@@ -439,3 +1482,44 @@ def plot_bifurcation_diagram(param_values, trajectories, param_name='Parameter')
     ax.grid(True, alpha=0.3)
     
     return fig, ax
+
+
+def plot_bifurcation_density(density, param_values, value_edges, param_name='Parameter',
+                             value_label='Membrane Potential (x)', ax=None, cmap='Greys',
+                             log_scale=True):
+    """
+    Show a bifurcation density image (from map_analysis.bifurcation_density)
+    
+    Parameters:
+    -----------
+    density : array, shape (n_bins, P)
+        Visit counts per (state bin, parameter value)
+    param_values : array, shape (P,)
+        Parameter values (image columns)
+    value_edges : array, shape (n_bins + 1,)
+        Bin edges of the vertical axis
+    param_name : str
+        Name of bifurcation parameter
+    value_label : str
+        Label of the vertical axis
+    ax : matplotlib axis, optional
+        Axis to draw on (a new figure is created otherwise)
+    cmap : str
+        Colormap
+    log_scale : bool
+        Show log(1 + counts) so sparse branches stay visible
+    """
+    if ax is None:
+        fig, ax = plt.subplots(figsize=VIZ_PARAMS['figsize'])
+    else:
+        fig = ax.figure
+    
+    image = np.log1p(density) if log_scale else density
+    ax.imshow(image, origin='lower', aspect='auto', cmap=cmap, interpolation='nearest',
+              extent=[param_values[0], param_values[-1], value_edges[0], value_edges[-1]])
+    
+    ax.set_xlabel(param_name)
+    ax.set_ylabel(value_label)
+    ax.set_title(f'Bifurcation Diagram vs {param_name}')
+    
+    return fig, ax